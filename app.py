@@ -1,28 +1,38 @@
 import os
+import json
 from dotenv import load_dotenv
 
 # Load environment variables from .env file (for local development)
 load_dotenv()
 
+# Set DEBUG=1 to show the entity data debug panel
+DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
+
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
-import folium
-from folium.plugins import HeatMap
-from streamlit_folium import st_folium
-import time
-import uuid
-from src.heatmap import get_complete_heatmap_analysis
-from app_components.heatmap_visuals import create_heatmap, create_segment_map, process_data
+import numpy as np
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+from app_components.heatmap_visuals import create_heatmap, create_segment_map, process_data, quantize_coordinates, spatial_bin
 
 # ============================================================================
 # MODERN STYLING COMPONENT (Inspired by Blue FC App)
 # ============================================================================
 
+# Inter is pulled with its own <link> rather than an @import inside the <style>
+# block, so the page styles apply without waiting on the font stylesheet.
+FONT_LINKS = """
+        <link rel="preconnect" href="https://fonts.googleapis.com">
+        <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+        <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap">
+        """
+
+@st.cache_resource
 def style_component():
-    style = """
+    """Return critical CSS (header, hero, parameter panel) and deferred CSS (results, legends, stats)"""
+    critical_css = FONT_LINKS + """
         <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
-
         /* Hide Streamlit elements */
         .stApp > header {background-color: transparent;}
         .stApp > header [data-testid="stHeader"] {display: none;}
@@ -129,25 +139,6 @@ def style_component():
             transform: translateY(-2px);
         }
 
-        /* Map Container */
-        .map-container {
-            background: white;
-            border-radius: 16px;
-            padding: 1.5rem;
-            margin: 1rem 0;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.06);
-            border: 1px solid #e2e8f0;
-        }
-
-        /* Legend Card */
-        .legend-card {
-            background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
-            border-radius: 12px;
-            padding: 1.5rem;
-            margin: 1rem 0;
-            border: 1px solid #cbd5e1;
-        }
-
         /* Buttons */
         .stButton > button {
             background: linear-gradient(135deg, #dc2626 0%, #991b1b 100%) !important;
@@ -183,6 +174,45 @@ def style_component():
             100% { transform: rotate(360deg); }
         }
 
+        /* Responsive */
+        @media (max-width: 768px) {
+            .hero-title { font-size: 2rem; }
+            .nav-header { 
+                flex-direction: column; 
+                text-align: center; 
+                gap: 1rem; 
+            }
+            .nav-logo { 
+                max-width: 100%; 
+                text-align: center; 
+            }
+            .content-card {
+                padding: 1.5rem;
+            }
+        }
+        </style>
+        """
+    deferred_css = """
+        <style>
+        /* Map Container */
+        .map-container {
+            background: white;
+            border-radius: 16px;
+            padding: 1.5rem;
+            margin: 1rem 0;
+            box-shadow: 0 4px 20px rgba(0,0,0,0.06);
+            border: 1px solid #e2e8f0;
+        }
+
+        /* Legend Card */
+        .legend-card {
+            background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
+            border-radius: 12px;
+            padding: 1.5rem;
+            margin: 1rem 0;
+            border: 1px solid #cbd5e1;
+        }
+
         /* Success callout */
         .success-callout {
             background: linear-gradient(135deg, #d1fae5, #a7f3d0);
@@ -232,94 +262,94 @@ def style_component():
             font-size: 0.9rem;
             font-weight: 500;
         }
-
-        /* Responsive */
-        @media (max-width: 768px) {
-            .hero-title { font-size: 2rem; }
-            .nav-header { 
-                flex-direction: column; 
-                text-align: center; 
-                gap: 1rem; 
-            }
-            .nav-logo { 
-                max-width: 100%; 
-                text-align: center; 
-            }
-            .content-card {
-                padding: 1.5rem;
-            }
-        }
         </style>
         """
-    return style
+    return critical_css, deferred_css
 
 # ============================================================================
 # SESSION STATE MANAGEMENT
 # ============================================================================
 
+SESSION_DEFAULTS = {
+    "political_data": None,
+    "entity_comparison_data": None,
+    "entity1_data": None,
+    "params": None,
+    "loading_state": False,
+    "map_interactions": 0,
+}
+
 def initialize_session_state():
     """Initialize session state variables to prevent reruns"""
-    if "analysis_id" not in st.session_state:
-        st.session_state.analysis_id = None
-    
-    if "political_data" not in st.session_state:
-        st.session_state.political_data = None
-    
-    if "entity_comparison_data" not in st.session_state:
-        st.session_state.entity_comparison_data = None
-    
-    if "entity1_data" not in st.session_state:
-        st.session_state.entity1_data = None
-    
-    if "params" not in st.session_state:
-        st.session_state.params = None
-    
-    if "loading_state" not in st.session_state:
-        st.session_state.loading_state = False
-    
-    if "map_interactions" not in st.session_state:
-        st.session_state.map_interactions = 0
+    for key, value in SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, value)
 
 # ============================================================================
 # DATA PROCESSING FUNCTIONS
 # ============================================================================
 
-@st.cache_data
+def hash_dataframe(df):
+    """Content hash used as the cache key for DataFrame arguments"""
+    # Row hashes alone ignore column names and dtypes, so the schema is part of the key
+    return (
+        tuple(df.columns),
+        tuple(map(str, df.dtypes)),
+        pd.util.hash_pandas_object(df, index=True).values.tobytes(),
+    )
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_heatmap_analysis(location, age=None, gender=None, audience_id=None, entity_name=None, min_popularity=None):
+    """Fetch one Qloo heatmap analysis, cached on the normalized request parameters"""
+    from src.heatmap import get_complete_heatmap_analysis
+    
+    params = {"location_query": location}
+    if age:
+        params["age"] = age
+    if gender:
+        params["gender"] = gender
+    if audience_id:
+        params["audience_ids"] = [audience_id]
+    if entity_name:
+        params["entity_names"] = [entity_name]
+    if min_popularity is not None:
+        params["min_popularity"] = min_popularity
+    
+    return get_complete_heatmap_analysis(**params)
+
+@st.cache_data(hash_funcs={pd.DataFrame: hash_dataframe})
 def process_entity_data(entity1_df, entity2_df):
-    """Process entity comparison data with caching"""
-    entity1_df1 = entity1_df.copy()
-    entity2_df1 = entity2_df.copy()
-    
-    # Rename columns
-    entity1_df1 = entity1_df1.rename(columns={
+    """Process entity comparison data, cached on the content of the input frames"""
+    # Rename and index on quantized location; rename returns a new frame, the inputs are untouched
+    entity1_df1 = entity1_df.rename(columns={
         'affinity': 'entity1_affinity',
         'popularity': 'entity1_popularity'
-    })
-    entity2_df1 = entity2_df1.rename(columns={
+    }).set_index(list(quantize_coordinates(entity1_df)))
+    entity2_df1 = entity2_df.rename(columns={
         'affinity': 'entity2_affinity', 
         'popularity': 'entity2_popularity'
-    })
+    }).set_index(list(quantize_coordinates(entity2_df)))
     
-    # Merge on location
-    df_combined = pd.merge(
-        entity1_df1,
-        entity2_df1[['latitude', 'longitude', 'entity2_affinity', 'entity2_popularity']],
-        on=['latitude', 'longitude'], 
+    # Join on the quantized location index
+    df_combined = entity1_df1.join(
+        entity2_df1[['entity2_affinity', 'entity2_popularity']],
         how='inner'
     )
     
     # Calculate net popularity (multiply by 100 to get percentage points)
-    df_combined['entity1_net_popularity'] = (df_combined['entity1_popularity'] - df_combined['entity2_popularity']) * 100
-    
-    # Ensure numeric types
-    df_combined['entity1_net_popularity'] = pd.to_numeric(df_combined['entity1_net_popularity'], errors='coerce')
+    df_combined['entity1_net_popularity'] = (
+        df_combined['entity1_popularity'].sub(df_combined['entity2_popularity']).mul(100)
+    )
     
     # Remove any rows with NaN values
     df_combined = df_combined.dropna(subset=['entity1_net_popularity'])
     
-    return df_combined
+    # Scores are only displayed to 3 decimals, float32 halves their footprint
+    score_cols = ['entity1_affinity', 'entity1_popularity', 'entity2_affinity', 'entity2_popularity', 'entity1_net_popularity']
+    df_combined[score_cols] = df_combined[score_cols].astype('float32')
+    
+    return df_combined.reset_index(drop=True)
 
-@st.cache_data
+@st.cache_data(hash_funcs={pd.DataFrame: hash_dataframe})
 def process_political_data(conservative_df, progressive_df):
     """Process political competition data with caching"""
     return process_data(conservative_df, progressive_df)
@@ -328,92 +358,143 @@ def process_political_data(conservative_df, progressive_df):
 # MAP CREATION FUNCTIONS
 # ============================================================================
 
-def create_entity_legend_map(df, entity1_name, entity2_name, map_key):
-    """Create entity comparison map with unique key"""
-    center_lat, center_lon = df['latitude'].mean(), df['longitude'].mean()
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=10)
-    
-    # Define color ranges based on entity1_net_popularity
-    def get_color_and_label(net_pop):
-        if net_pop >= 5:
-            return '#000080', f'Strong {entity1_name} (5+)'
-        elif net_pop >= 2:
-            return '#4169E1', f'Moderate {entity1_name} (2-5)'
-        elif net_pop >= 0.5:
-            return '#ADD8E6', f'Lean {entity1_name} (0.5-2)'
-        elif net_pop >= -0.5:
-            return '#D3D3D3', 'Competitive (-0.5 to 0.5)'
-        elif net_pop >= -2:
-            return '#FFB6C1', f'Lean {entity2_name} (-0.5 to -2)'
-        elif net_pop >= -5:
-            return '#DC143C', f'Moderate {entity2_name} (-2 to -5)'
-        else:
-            return '#8B0000', f'Strong {entity2_name} (-5+)'
-    
-    for _, row in df.iterrows():
-        color, label = get_color_and_label(row['entity1_net_popularity'])
-        
-        popup_text = f"""
-        <b>{label}</b><br>
-        Net Score: {row['entity1_net_popularity']:.2f}<br>
-        {entity1_name}: {row['entity1_popularity']:.3f}<br>
-        {entity2_name}: {row['entity2_popularity']:.3f}
-        """
-        
-        folium.CircleMarker(
-            [row['latitude'], row['longitude']],
-            radius=8,
-            color='black',
-            fillColor=color,
-            fillOpacity=0.8,
-            popup=popup_text
-        ).add_to(m)
-    
-    return m
+# Net popularity thresholds shared by the legend maps and stats. Buckets are
+# numbered from the strongest positive (0) to the strongest negative (6);
+# missing scores get NO_NET_POPULARITY_BUCKET.
+NET_POPULARITY_BINS = np.array([-5, -2, -0.5, 0.5, 2, 5])
+NO_NET_POPULARITY_BUCKET = -1
 
-def create_political_legend_map(df, map_key):
-    """Create political competition map with unique key"""
-    center_lat, center_lon = df['latitude'].mean(), df['longitude'].mean()
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=10)
-    
-    # Define color ranges based on conservative_net_popularity
-    def get_color_and_label(net_pop):
-        if net_pop >= 5:
-            return '#8B0000', 'Strong Conservative (5+)'
-        elif net_pop >= 2:
-            return '#DC143C', 'Moderate Conservative (2-5)'
-        elif net_pop >= 0.5:
-            return '#FFB6C1', 'Lean Conservative (0.5-2)'
-        elif net_pop >= -0.5:
-            return '#D3D3D3', 'Competitive (-0.5 to 0.5)'
-        elif net_pop >= -2:
-            return '#ADD8E6', 'Lean Progressive (-0.5 to -2)'
-        elif net_pop >= -5:
-            return '#4169E1', 'Moderate Progressive (-2 to -5)'
-        else:
-            return '#000080', 'Strong Progressive (-5+)'
-    
-    for _, row in df.iterrows():
-        color, label = get_color_and_label(row['conservative_net_popularity'])
-        
-        popup_text = f"""
-        <b>{label}</b><br>
-        Net Score: {row['conservative_net_popularity']:.2f}<br>
-        Conservative: {row['conservative_popularity']:.3f}<br>
-        Progressive: {row['progressive_popularity']:.3f}
-        """
-        
-        folium.CircleMarker(
-            [row['latitude'], row['longitude']],
-            radius=8,
-            color='black',
-            fillColor=color,
-            fillOpacity=0.8,
-            popup=popup_text
-        ).add_to(m)
-    
+def net_popularity_buckets(values):
+    """Vectorized bucket index (0-6, or -1 for NaN) for an array of net popularity scores"""
+    values = np.asarray(values, dtype=np.float64)
+    buckets = (len(NET_POPULARITY_BINS) - np.digitize(values, NET_POPULARITY_BINS)).astype(np.int8)
+    # digitize puts NaN past the last edge, which would read as the strongest positive bucket
+    buckets[np.isnan(values)] = NO_NET_POPULARITY_BUCKET
+    return buckets
+
+# Browser-side marker factory for FastMarkerCluster. Each data row is
+# [lat, lon, bucket, net, score1, score2]; the page carries one data array
+# instead of one marker per point.
+_NET_POPULARITY_MARKER_JS = """
+(function () {
+    var colors = %(colors)s;
+    var labels = %(labels)s;
+    var names = %(names)s;
+    return function (row) {
+        var i = row[2];
+        var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+            radius: 8, color: 'black', weight: 3, fillColor: colors[i], fillOpacity: 0.8
+        });
+        // Popup HTML is only built when a marker is opened
+        marker.bindPopup(function () {
+            return '<b>' + labels[i] + '</b><br>' +
+                'Net Score: ' + row[3].toFixed(2) + '<br>' +
+                names[0] + ': ' + row[4].toFixed(3) + '<br>' +
+                names[1] + ': ' + row[5].toFixed(3);
+        });
+        return marker;
+    };
+})()
+"""
+
+# Above this many points, markers are averaged per grid cell before rendering.
+# Below it every point is sent and the browser clusters them when zoomed out.
+SPATIAL_BIN_THRESHOLD = 10000
+
+def add_net_popularity_markers(m, df, net_col, score_cols, names, colors, labels, cell_size=0.005):
+    """Add color-bucketed net popularity markers to a map as a single layer"""
+    from folium.plugins import FastMarkerCluster
+    
+    if len(df) > SPATIAL_BIN_THRESHOLD:
+        df = spatial_bin(df, [net_col, *score_cols], cell_size=cell_size)
+    
+    values = df[['latitude', 'longitude', net_col, *score_cols]].to_numpy()
+    buckets = net_popularity_buckets(values[:, 2])
+    # Points without a net score have no category to draw
+    has_score = buckets != NO_NET_POPULARITY_BUCKET
+    values, buckets = values[has_score], buckets[has_score]
+    # Round to the precision the map and popups show (~1m positions) to keep the payload small;
+    # colors and labels travel once in the callback, each row only carries its bucket index
+    coords = np.round(values[:, :2], 5).tolist()
+    scores = np.column_stack([np.round(values[:, 2], 2), np.round(values[:, 3:], 3)]).tolist()
+    data = [[*xy, bucket, *s] for xy, bucket, s in zip(coords, buckets.tolist(), scores)]
+    callback = _NET_POPULARITY_MARKER_JS % {
+        'colors': json.dumps(colors),
+        'labels': json.dumps(labels),
+        'names': json.dumps(names),
+    }
+    # Cluster only when zoomed out past the initial view; chunked loading keeps the page responsive
+    FastMarkerCluster(data, callback=callback, options={
+        'disableClusteringAtZoom': 10,
+        'chunkedLoading': True,
+    }).add_to(m)
     return m
 
+def create_base_map(df):
+    """Create a map centered on the points in df, or a world view when df is empty"""
+    import folium
+    
+    # Canvas renderer draws all circle markers into one element instead of an SVG node each
+    if df.empty:
+        return folium.Map(location=[0, 0], zoom_start=2, prefer_canvas=True)
+    center_lat, center_lon = df[['latitude', 'longitude']].to_numpy().mean(axis=0)
+    return folium.Map(location=[center_lat, center_lon], zoom_start=10, prefer_canvas=True)
+
+@st.cache_resource(hash_funcs={pd.DataFrame: hash_dataframe})
+def create_entity_legend_map(df, entity1_name, entity2_name):
+    """Create entity comparison map, rendered to HTML cached on the frame content and names"""
+    m = create_base_map(df)
+    if df.empty:
+        return m.get_root().render()
+    
+    # Color ranges based on entity1_net_popularity, strongest entity 1 first
+    colors = ['#000080', '#4169E1', '#ADD8E6', '#D3D3D3', '#FFB6C1', '#DC143C', '#8B0000']
+    labels = [
+        f'Strong {entity1_name} (5+)',
+        f'Moderate {entity1_name} (2-5)',
+        f'Lean {entity1_name} (0.5-2)',
+        'Competitive (-0.5 to 0.5)',
+        f'Lean {entity2_name} (-0.5 to -2)',
+        f'Moderate {entity2_name} (-2 to -5)',
+        f'Strong {entity2_name} (-5+)',
+    ]
+    
+    add_net_popularity_markers(
+        m, df, 'entity1_net_popularity', ['entity1_popularity', 'entity2_popularity'],
+        [entity1_name, entity2_name], colors, labels
+    )
+    return m.get_root().render()
+
+@st.cache_resource(hash_funcs={pd.DataFrame: hash_dataframe})
+def create_political_legend_map(df):
+    """Create political competition map, rendered to HTML cached on the frame content"""
+    m = create_base_map(df)
+    if df.empty:
+        return m.get_root().render()
+    
+    # Color ranges based on conservative_net_popularity, strongest conservative first
+    colors = ['#8B0000', '#DC143C', '#FFB6C1', '#D3D3D3', '#ADD8E6', '#4169E1', '#000080']
+    labels = [
+        'Strong Conservative (5+)',
+        'Moderate Conservative (2-5)',
+        'Lean Conservative (0.5-2)',
+        'Competitive (-0.5 to 0.5)',
+        'Lean Progressive (-0.5 to -2)',
+        'Moderate Progressive (-2 to -5)',
+        'Strong Progressive (-5+)',
+    ]
+    
+    add_net_popularity_markers(
+        m, df, 'conservative_net_popularity', ['conservative_popularity', 'progressive_popularity'],
+        ['Conservative', 'Progressive'], colors, labels
+    )
+    return m.get_root().render()
+
+@st.cache_resource(hash_funcs={pd.DataFrame: hash_dataframe})
+def create_segment_map_html(df):
+    """Create strategy segment map, rendered to HTML cached on the frame content"""
+    return create_segment_map(df).get_root().render()
+
 # ============================================================================
 # UI COMPONENTS
 # ============================================================================
@@ -443,6 +524,15 @@ def render_navigation():
     </div>
     """, unsafe_allow_html=True)
 
+class ParamPanel(NamedTuple):
+    """Values entered in the parameter panel for the current run"""
+    location: str
+    age: str
+    gender: str
+    entity1: str
+    entity2: str
+    should_load: bool
+
 def render_parameter_panel():
     """Render parameter input panel with modern styling"""
     st.markdown('<div class="content-card">', unsafe_allow_html=True)
@@ -493,8 +583,9 @@ def render_parameter_panel():
         
         st.markdown("<br>", unsafe_allow_html=True)
         
-        # Load button with loading state
-        if st.session_state.loading_state:
+        # Load button with loading state; a load in progress keeps loading
+        should_load = st.session_state.loading_state
+        if should_load:
             st.markdown('''
             <div style="text-align: center; padding: 10px;">
                 <div class="loading-animation"></div>
@@ -502,18 +593,18 @@ def render_parameter_panel():
             </div>
             ''', unsafe_allow_html=True)
         else:
-            load_button = st.button("🔄 Load Analysis", type="primary", use_container_width=True)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+            should_load = st.button("🔄 Load Analysis", type="primary", use_container_width=True)
     
-    return location, age, gender, entity1, entity2, st.session_state.loading_state or load_button
+    return ParamPanel(location, age, gender, entity1, entity2, should_load)
 
 def render_analysis_results():
     """Render analysis results with modern styling"""
-    if not st.session_state.political_data is not None:
+    state = st.session_state
+    df = state.political_data
+    if not isinstance(df, pd.DataFrame):
         return
     
-    params = st.session_state.params
+    params = state.params
     
     # Current analysis info
     age_display = f" • {params['age']}" if params['age'] != "All ages" else ""
@@ -530,36 +621,30 @@ def render_analysis_results():
         st.markdown('<div class="map-container">', unsafe_allow_html=True)
         st.markdown("### 🗺️ Political Strength Map")
         
-        df = st.session_state.political_data
-        if isinstance(df, pd.DataFrame) and len(df) > 0:
-            map_obj = create_political_legend_map(df, f"political_map_{st.session_state.analysis_id}")
+        if not df.empty:
+            map_html = create_political_legend_map(df)
             st.markdown("**Color-coded by political strength levels**")
             
-            # Use unique key to prevent reruns with better sizing
-            st_folium(map_obj, width=None, height=900, key=f"political_legend_{st.session_state.analysis_id}")
+            # Display-only map: embed the cached HTML directly instead of a st_folium round trip
+            components.html(map_html, height=900)
         else:
             st.error("No political data available")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         render_political_stats()
 
 def render_political_stats():
     """Render political statistics with modern styling"""
-    if not isinstance(st.session_state.political_data, pd.DataFrame):
-        return
-    
     df = st.session_state.political_data
+    if not isinstance(df, pd.DataFrame):
+        return
     
-    # Calculate areas by category  
-    strong_conservative = len(df[df['conservative_net_popularity'] >= 5])
-    moderate_conservative = len(df[(df['conservative_net_popularity'] >= 2) & (df['conservative_net_popularity'] < 5)])
-    lean_conservative = len(df[(df['conservative_net_popularity'] >= 0.5) & (df['conservative_net_popularity'] < 2)])
-    competitive = len(df[(df['conservative_net_popularity'] >= -0.5) & (df['conservative_net_popularity'] < 0.5)])
-    lean_progressive = len(df[(df['conservative_net_popularity'] >= -2) & (df['conservative_net_popularity'] < -0.5)])
-    moderate_progressive = len(df[(df['conservative_net_popularity'] >= -5) & (df['conservative_net_popularity'] < -2)])
-    strong_progressive = len(df[df['conservative_net_popularity'] < -5])
+    # Count areas by category in one pass, strongest conservative first
+    buckets = net_popularity_buckets(df['conservative_net_popularity'].to_numpy())
+    (strong_conservative, moderate_conservative, lean_conservative, competitive,
+     lean_progressive, moderate_progressive, strong_progressive) = np.bincount(
+        buckets[buckets != NO_NET_POPULARITY_BUCKET], minlength=len(NET_POPULARITY_BINS) + 1
+    ).tolist()
     
     total_areas = len(df)
     
@@ -569,30 +654,31 @@ def render_political_stats():
     # Total areas stat
     st.markdown(f'<div class="stat-card"><div class="stat-number">{total_areas}</div><div class="stat-label">Total Areas</div></div>', unsafe_allow_html=True)
     
-    # Conservative stats
-    st.markdown("**🔴 Conservative Strength:**")
-    st.markdown(f"• Strong: **{strong_conservative}** areas")
-    st.markdown(f"• Moderate: **{moderate_conservative}** areas")  
-    st.markdown(f"• Lean: **{lean_conservative}** areas")
-    
-    # Competitive
-    st.markdown("**⚖️ Competitive Areas:**")
-    st.markdown(f"• Swing: **{competitive}** areas")
-    
-    # Progressive stats
-    st.markdown("**🔵 Progressive Strength:**")
-    st.markdown(f"• Lean: **{lean_progressive}** areas")
-    st.markdown(f"• Moderate: **{moderate_progressive}** areas")
-    st.markdown(f"• Strong: **{strong_progressive}** areas")
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+    # Category breakdown as one markdown element; trailing double spaces are hard line breaks
+    st.markdown(f"""
+    **🔴 Conservative Strength:**  
+    • Strong: **{strong_conservative}** areas  
+    • Moderate: **{moderate_conservative}** areas  
+    • Lean: **{lean_conservative}** areas
+    
+    **⚖️ Competitive Areas:**  
+    • Swing: **{competitive}** areas
+    
+    **🔵 Progressive Strength:**  
+    • Lean: **{lean_progressive}** areas  
+    • Moderate: **{moderate_progressive}** areas  
+    • Strong: **{strong_progressive}** areas
+    """)
 
 def render_entity_comparison():
     """Render entity comparison section"""
-    if not st.session_state.entity_comparison_data is not None:
+    state = st.session_state
+    df = state.entity_comparison_data
+    if not isinstance(df, pd.DataFrame):
         return
     
-    params = st.session_state.params
+    params = state.params
+    entity1, entity2 = params['entity1'], params['entity2']
     
     st.markdown("## 👥 Entity Comparison Analysis")
     
@@ -600,51 +686,52 @@ def render_entity_comparison():
     
     with col1:
         st.markdown('<div class="map-container">', unsafe_allow_html=True)
-        st.markdown(f"### 🔄 {params['entity1']} vs {params['entity2']}")
+        st.markdown(f"### 🔄 {entity1} vs {entity2}")
         
-        df = st.session_state.entity_comparison_data
-        if isinstance(df, pd.DataFrame) and len(df) > 0:
-            map_obj = create_entity_legend_map(df, params['entity1'], params['entity2'], f"entity_map_{st.session_state.analysis_id}")
+        if not df.empty:
+            map_html = create_entity_legend_map(df, entity1, entity2)
             st.markdown("**Blue = Entity 1 stronger, Red = Entity 2 stronger**")
             
-            # Use unique key to prevent reruns with better sizing
-            st_folium(map_obj, width=None, height=900, key=f"entity_comparison_{st.session_state.analysis_id}")
+            # Display-only map: embed the cached HTML directly instead of a st_folium round trip
+            components.html(map_html, height=900)
             
-            # Quick stats
-            avg_net = df['entity1_net_popularity'].mean()
-            entity1_dominant = len(df[df['entity1_net_popularity'] > 0])
-            entity2_dominant = len(df[df['entity1_net_popularity'] < 0])
-            competitive = len(df[abs(df['entity1_net_popularity']) < 0.5])
+            # Quick stats, reduced straight from the ndarray (NaN rows were dropped in processing)
+            net = df['entity1_net_popularity'].to_numpy()
+            avg_net = net.mean()
+            entity1_dominant = np.count_nonzero(net > 0)
+            entity2_dominant = np.count_nonzero(net < 0)
+            competitive = np.count_nonzero(np.abs(net) < 0.5)
             
             st.markdown(f"""
             **📈 Net Score:** {avg_net:.2f}  
-            **🔵 {params['entity1']} Dominant:** {entity1_dominant}  
-            **🔴 {params['entity2']} Dominant:** {entity2_dominant}  
+            **🔵 {entity1} Dominant:** {entity1_dominant}  
+            **🔴 {entity2} Dominant:** {entity2_dominant}  
             **⚖️ Competitive:** {competitive}
             """)
         else:
             st.error("No comparison data available")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         st.markdown('<div class="map-container">', unsafe_allow_html=True)
-        st.markdown(f"### 🎯 {params['entity1']} Strategy Segments")
+        st.markdown(f"### 🎯 {entity1} Strategy Segments")
         
-        df = st.session_state.entity1_data
-        if isinstance(df, pd.DataFrame) and len(df) > 0:
-            map_obj = create_segment_map(df)
+        # entity1_data is stored together with entity_comparison_data
+        df = state.entity1_data
+        if not df.empty:
+            map_html = create_segment_map_html(df)
             st.markdown("**Campaign strategy areas**")
             
-            # Use unique key to prevent reruns with better sizing
-            st_folium(map_obj, width=None, height=900, key=f"entity1_segments_{st.session_state.analysis_id}")
+            # Display-only map: embed the cached HTML directly instead of a st_folium round trip
+            components.html(map_html, height=900)
             
             # Strategy segments stats
             if 'segment' in df.columns:
                 segment_counts = df['segment'].value_counts()
-                st.markdown("**🎯 Strategy Segments:**")
-                for segment, count in segment_counts.items():
-                    st.markdown(f"• {segment}: **{count}** areas")
+                # One markdown element for the whole list; trailing double spaces are hard line breaks
+                st.markdown("  \n".join(
+                    ["**🎯 Strategy Segments:**"]
+                    + [f"• {segment}: **{count}** areas" for segment, count in segment_counts.items()]
+                ))
             
             # Performance stats
             avg_affinity = df['affinity'].mean() if 'affinity' in df.columns else 0
@@ -653,9 +740,108 @@ def render_entity_comparison():
             st.markdown(f"**📊 Avg Popularity:** {avg_popularity:.3f}")
         else:
             st.error("No entity 1 data available")
-        
-        st.markdown('</div>', unsafe_allow_html=True)
     
+
+# Static legend markup, built once at import rather than on every rerun
+_POLITICAL_LEGEND_HTML = """
+<div style='margin: 10px 0;'>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #8B0000; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Strong Conservative (5+)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #DC143C; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Moderate Conservative (2-5)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #FFB6C1; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Lean Conservative (0.5-2)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #D3D3D3; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Competitive (-0.5 to 0.5)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #ADD8E6; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Lean Progressive (-0.5 to -2)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #4169E1; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Moderate Progressive (-2 to -5)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #000080; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Strong Progressive (-5+)</span>
+    </div>
+</div>
+"""
+
+_ENTITY_LEGEND_TEMPLATE = """
+<div style='margin: 10px 0;'>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #000080; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Strong {entity1} (5+)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #4169E1; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Moderate {entity1} (2-5)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #ADD8E6; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Lean {entity1} (0.5-2)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #D3D3D3; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Competitive (-0.5 to 0.5)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #FFB6C1; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Lean {entity2} (-0.5 to -2)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #DC143C; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Moderate {entity2} (-2 to -5)</span>
+    </div>
+    <div style='display: flex; align-items: center; margin: 8px 0;'>
+        <div style='width: 20px; height: 20px; background-color: #8B0000; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <span style='font-weight: 600; color: #1f2937;'>Strong {entity2} (-5+)</span>
+    </div>
+</div>
+"""
+
+_STRATEGY_LEGEND_HTML = """
+<div style='margin: 10px 0;'>
+    <div style='display: flex; align-items: center; margin: 12px 0;'>
+        <div style='width: 24px; height: 24px; background-color: #00FF00; border-radius: 50%; margin-right: 15px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <div>
+            <span style='font-weight: 700; color: #1f2937; font-size: 1.0rem;'>Rally the Base</span><br>
+            <span style='color: #6b7280; font-size: 0.8rem;'>(HA-HP: High Affinity, High Popularity)</span>
+        </div>
+    </div>
+    <div style='display: flex; align-items: center; margin: 12px 0;'>
+        <div style='width: 24px; height: 24px; background-color: #0000FF; border-radius: 50%; margin-right: 15px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <div>
+            <span style='font-weight: 700; color: #1f2937; font-size: 1.0rem;'>Hidden Goldmine</span><br>
+            <span style='color: #6b7280; font-size: 0.8rem;'>(HA-LP: High Affinity, Low Popularity)</span>
+        </div>
+    </div>
+    <div style='display: flex; align-items: center; margin: 12px 0;'>
+        <div style='width: 24px; height: 24px; background-color: #FFFF00; border-radius: 50%; margin-right: 15px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <div>
+            <span style='font-weight: 700; color: #1f2937; font-size: 1.0rem;'>Bring Them Over</span><br>
+            <span style='color: #6b7280; font-size: 0.8rem;'>(LA-HP: Low Affinity, High Popularity)</span>
+        </div>
+    </div>
+    <div style='display: flex; align-items: center; margin: 12px 0;'>
+        <div style='width: 24px; height: 24px; background-color: #FF0000; border-radius: 50%; margin-right: 15px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
+        <div>
+            <span style='font-weight: 700; color: #1f2937; font-size: 1.0rem;'>Deep Conversion</span><br>
+            <span style='color: #6b7280; font-size: 0.8rem;'>(LA-LP: Low Affinity, Low Popularity)</span>
+        </div>
+    </div>
+</div>
+"""
+
 def render_all_legends():
     """Render all legends in a dedicated section"""
     if not st.session_state.params:
@@ -672,182 +858,61 @@ def render_all_legends():
     with col1:
         st.markdown('<div class="legend-card">', unsafe_allow_html=True)
         st.markdown("### 🏛️ Political Strength Legend")
-        
-        legend_html = """
-        <div style='margin: 10px 0;'>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #8B0000; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Strong Conservative (5+)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #DC143C; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Moderate Conservative (2-5)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #FFB6C1; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Lean Conservative (0.5-2)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #D3D3D3; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Competitive (-0.5 to 0.5)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #ADD8E6; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Lean Progressive (-0.5 to -2)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #4169E1; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Moderate Progressive (-2 to -5)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #000080; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Strong Progressive (-5+)</span>
-            </div>
-        </div>
-        """
-        st.markdown(legend_html, unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(_POLITICAL_LEGEND_HTML, unsafe_allow_html=True)
     
     # Entity Comparison Legend
     with col2:
         st.markdown('<div class="legend-card">', unsafe_allow_html=True)
         st.markdown(f"### 👥 {params['entity1']} vs {params['entity2']} Legend")
-        
-        entity_legend_html = f"""
-        <div style='margin: 10px 0;'>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #000080; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Strong {params['entity1']} (5+)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #4169E1; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Moderate {params['entity1']} (2-5)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #ADD8E6; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Lean {params['entity1']} (0.5-2)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #D3D3D3; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Competitive (-0.5 to 0.5)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #FFB6C1; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Lean {params['entity2']} (-0.5 to -2)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #DC143C; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Moderate {params['entity2']} (-2 to -5)</span>
-            </div>
-            <div style='display: flex; align-items: center; margin: 8px 0;'>
-                <div style='width: 20px; height: 20px; background-color: #8B0000; border-radius: 50%; margin-right: 12px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <span style='font-weight: 600; color: #1f2937;'>Strong {params['entity2']} (-5+)</span>
-            </div>
-        </div>
-        """
-        st.markdown(entity_legend_html, unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(_ENTITY_LEGEND_TEMPLATE.format(entity1=params['entity1'], entity2=params['entity2']), unsafe_allow_html=True)
     
     # Strategy Segments Legend
     with col3:
         st.markdown('<div class="legend-card">', unsafe_allow_html=True)
         st.markdown("### 🎯 Strategy Segments Legend")
-        
-        strategy_legend_html = """
-        <div style='margin: 10px 0;'>
-            <div style='display: flex; align-items: center; margin: 12px 0;'>
-                <div style='width: 24px; height: 24px; background-color: #00FF00; border-radius: 50%; margin-right: 15px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <div>
-                    <span style='font-weight: 700; color: #1f2937; font-size: 1.0rem;'>Rally the Base</span><br>
-                    <span style='color: #6b7280; font-size: 0.8rem;'>(HA-HP: High Affinity, High Popularity)</span>
-                </div>
-            </div>
-            <div style='display: flex; align-items: center; margin: 12px 0;'>
-                <div style='width: 24px; height: 24px; background-color: #0000FF; border-radius: 50%; margin-right: 15px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <div>
-                    <span style='font-weight: 700; color: #1f2937; font-size: 1.0rem;'>Hidden Goldmine</span><br>
-                    <span style='color: #6b7280; font-size: 0.8rem;'>(HA-LP: High Affinity, Low Popularity)</span>
-                </div>
-            </div>
-            <div style='display: flex; align-items: center; margin: 12px 0;'>
-                <div style='width: 24px; height: 24px; background-color: #FFFF00; border-radius: 50%; margin-right: 15px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <div>
-                    <span style='font-weight: 700; color: #1f2937; font-size: 1.0rem;'>Bring Them Over</span><br>
-                    <span style='color: #6b7280; font-size: 0.8rem;'>(LA-HP: Low Affinity, High Popularity)</span>
-                </div>
-            </div>
-            <div style='display: flex; align-items: center; margin: 12px 0;'>
-                <div style='width: 24px; height: 24px; background-color: #FF0000; border-radius: 50%; margin-right: 15px; border: 2px solid white; box-shadow: 0 2px 4px rgba(0,0,0,0.2);'></div>
-                <div>
-                    <span style='font-weight: 700; color: #1f2937; font-size: 1.0rem;'>Deep Conversion</span><br>
-                    <span style='color: #6b7280; font-size: 0.8rem;'>(LA-LP: Low Affinity, Low Popularity)</span>
-                </div>
-            </div>
-        </div>
-        """
-        st.markdown(strategy_legend_html, unsafe_allow_html=True)
-        st.markdown('</div>', unsafe_allow_html=True)
-    """Render usage guide when no data is loaded"""
-    st.markdown('<div class="info-callout">', unsafe_allow_html=True)
-    st.markdown("### 💡 Usage Guide")
-    st.markdown("""
-    **This dashboard provides:**
-    
-    1. **🏛️ Political Competition Map** - Shows relative strength of Conservative vs Progressive audiences
-    2. **👥 Entity Comparison Map** - Shows which entity dominates in popularity across different areas  
-    3. **🎯 Strategy Segments** - Shows campaign strategy areas for the first entity
-    
-    **Get Started:**
-    1. Enter your target location (city, state, or region)
-    2. Optionally filter by age group and gender
-    3. Enter two entities to compare (politicians, brands, public figures)
-    4. Click "Load Analysis" to start
-    
-    **Example Entities:** Joe Biden, Donald Trump, Tesla, Nike, Taylor Swift, Elon Musk
-    """)
-    st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown(_STRATEGY_LEGEND_HTML, unsafe_allow_html=True)
+
+_USAGE_GUIDE_MD = """
+**This dashboard provides:**
+
+1. **🏛️ Political Competition Map** - Shows relative strength of Conservative vs Progressive audiences
+2. **👥 Entity Comparison Map** - Shows which entity dominates in popularity across different areas  
+3. **🎯 Strategy Segments** - Shows campaign strategy areas for the first entity
+
+**Get Started:**
+1. Enter your target location (city, state, or region)
+2. Optionally filter by age group and gender
+3. Enter two entities to compare (politicians, brands, public figures)
+4. Click "Load Analysis" to start
+
+**Example Entities:** Joe Biden, Donald Trump, Tesla, Nike, Taylor Swift, Elon Musk
+"""
 
 def render_usage_guide():
     """Render usage guide when no data is loaded"""
     st.markdown('<div class="info-callout">', unsafe_allow_html=True)
     st.markdown("### 💡 Usage Guide")
-    st.markdown("""
-    **This dashboard provides:**
-    
-    1. **🏛️ Political Competition Map** - Shows relative strength of Conservative vs Progressive audiences
-    2. **👥 Entity Comparison Map** - Shows which entity dominates in popularity across different areas  
-    3. **🎯 Strategy Segments** - Shows campaign strategy areas for the first entity
-    
-    **Get Started:**
-    1. Enter your target location (city, state, or region)
-    2. Optionally filter by age group and gender
-    3. Enter two entities to compare (politicians, brands, public figures)
-    4. Click "Load Analysis" to start
-    
-    **Example Entities:** Joe Biden, Donald Trump, Tesla, Nike, Taylor Swift, Elon Musk
-    """)
-    st.markdown('</div>', unsafe_allow_html=True)
+    st.markdown(_USAGE_GUIDE_MD)
 
 
 def debug_entity_data_loading(entity1_df, entity2_df, entity1_name, entity2_name, age, gender):
     """Debug entity data loading to find demographic bias"""
+    if not DEBUG:
+        return
     
     st.write("### 🔍 Entity Data Debug Info")
     
-    # Basic stats
-    st.write(f"**{entity1_name} Data:**")
-    st.write(f"• Data points: {len(entity1_df)}")
-    if len(entity1_df) > 0:
-        st.write(f"• Popularity range: {entity1_df['popularity'].min():.3f} - {entity1_df['popularity'].max():.3f}")
-        st.write(f"• Average popularity: {entity1_df['popularity'].mean():.3f}")
-        st.write(f"• Affinity range: {entity1_df['affinity'].min():.3f} - {entity1_df['affinity'].max():.3f}")
-    
-    st.write(f"**{entity2_name} Data:**")
-    st.write(f"• Data points: {len(entity2_df)}")
-    if len(entity2_df) > 0:
-        st.write(f"• Popularity range: {entity2_df['popularity'].min():.3f} - {entity2_df['popularity'].max():.3f}")
-        st.write(f"• Average popularity: {entity2_df['popularity'].mean():.3f}")
-        st.write(f"• Affinity range: {entity2_df['affinity'].min():.3f} - {entity2_df['affinity'].max():.3f}")
+    # Basic stats, one aggregation pass per entity
+    score_stats = []
+    for name, df in ((entity1_name, entity1_df), (entity2_name, entity2_df)):
+        st.write(f"**{name} Data:**")
+        st.write(f"• Data points: {len(df)}")
+        if len(df) > 0:
+            stats = df[['popularity', 'affinity']].agg(['min', 'max', 'mean'])
+            score_stats.append(stats)
+            st.write(f"• Popularity range: {stats.loc['min', 'popularity']:.3f} - {stats.loc['max', 'popularity']:.3f}")
+            st.write(f"• Average popularity: {stats.loc['mean', 'popularity']:.3f}")
+            st.write(f"• Affinity range: {stats.loc['min', 'affinity']:.3f} - {stats.loc['max', 'affinity']:.3f}")
     
     # Check demographic impact
     demo_filters = []
@@ -862,7 +927,7 @@ def debug_entity_data_loading(entity1_df, entity2_df, entity1_name, entity2_name
     # Data ratio analysis
     if len(entity1_df) > 0 and len(entity2_df) > 0:
         ratio = len(entity1_df) / len(entity2_df)
-        pop_ratio = entity1_df['popularity'].mean() / entity2_df['popularity'].mean()
+        pop_ratio = score_stats[0].loc['mean', 'popularity'] / score_stats[1].loc['mean', 'popularity']
         
         st.write(f"**Data Point Ratio:** {ratio:.2f}:1 ({entity1_name}:{entity2_name})")
         st.write(f"**Popularity Ratio:** {pop_ratio:.2f}:1")
@@ -898,8 +963,9 @@ def main():
         layout="wide"
     )
     
-    # Apply modern styling
-    st.markdown(style_component(), unsafe_allow_html=True)
+    # Apply modern styling: critical styles now, the rest after the parameter panel
+    critical_css, deferred_css = style_component()
+    st.markdown(critical_css, unsafe_allow_html=True)
     
     # Initialize session state
     initialize_session_state()
@@ -909,6 +975,7 @@ def main():
     
     # Parameter panel
     location, age, gender, entity1, entity2, should_load = render_parameter_panel()
+    st.markdown(deferred_css, unsafe_allow_html=True)
     
     # Load data only when button is clicked
     if should_load and not st.session_state.loading_state:
@@ -928,45 +995,42 @@ def main():
         st.session_state.last_entity1 = entity1
         st.session_state.last_entity2 = entity2
         
-        # Generate unique analysis ID to prevent map rerun issues
-        st.session_state.analysis_id = f"analysis_{uuid.uuid4().hex[:8]}"
-        
         # Show loading state
         with st.spinner("🔄 Loading political intelligence data..."):
             try:
-                # Prepare common parameters
-                common_params = {"location_query": location.strip()}
-                if age: 
-                    common_params["age"] = age
-                if gender: 
-                    common_params["gender"] = gender
+                # Normalize parameters so repeat loads hit the cache
+                common_params = {
+                    "location": location.strip(),
+                    "age": age or None,
+                    "gender": gender or None
+                }
                 
-                # Load political audience data
-                progressive_df = get_complete_heatmap_analysis(
-                    audience_ids=['urn:audience:political_preferences:politically_progressive'],
-                    **common_params
-                )
-                progressive_df = progressive_df[progressive_df['popularity'] > 0.5]
+                # The four fetches are independent network calls, run them concurrently
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    progressive_future = executor.submit(
+                        load_heatmap_analysis,
+                        audience_id='urn:audience:political_preferences:politically_progressive',
+                        min_popularity=0.5,
+                        **common_params
+                    )
+                    conservative_future = executor.submit(
+                        load_heatmap_analysis,
+                        audience_id='urn:audience:political_preferences:politically_conservative',
+                        min_popularity=0.5,
+                        **common_params
+                    )
+                    entity1_future = executor.submit(load_heatmap_analysis, entity_name=entity1.strip(), **common_params)
+                    entity2_future = executor.submit(load_heatmap_analysis, entity_name=entity2.strip(), **common_params)
+                    
+                    progressive_df = progressive_future.result()
+                    conservative_df = conservative_future.result()
+                    entity1_df = entity1_future.result()
+                    entity2_df = entity2_future.result()
                 
-                conservative_df = get_complete_heatmap_analysis(
-                    audience_ids=['urn:audience:political_preferences:politically_conservative'],
-                    **common_params
-                )
-                conservative_df = conservative_df[conservative_df['popularity'] > 0.5]
-
                 # Process political competition data
                 political_competition_df = process_political_data(conservative_df, progressive_df)
                 
-                # Load entity data
-                entity1_df = get_complete_heatmap_analysis(
-                    entity_names=[entity1.strip()],
-                    **common_params
-                )
-                entity2_df = get_complete_heatmap_analysis(
-                    entity_names=[entity2.strip()],
-                    **common_params
-                )
-                # debug_entity_data_loading(entity1_df, entity2_df, entity1, entity2, age, gender)
+                debug_entity_data_loading(entity1_df, entity2_df, entity1, entity2, age, gender)
                 # Process entity comparison data
                 entity_comparison_df = process_entity_data(entity1_df, entity2_df)
                 
@@ -985,8 +1049,8 @@ def main():
                 # Clear loading state
                 st.session_state.loading_state = False
                 
-                st.success("✅ Analysis completed successfully!")
-                time.sleep(1)
+                # Rerun straight away so the header status reflects the loaded data;
+                # the results section carries its own "Analysis Complete" callout
                 st.rerun()
                 
             except Exception as e:
@@ -1,54 +1,117 @@
+import json
 import streamlit as st
 import pandas as pd
-import folium
-from folium.plugins import HeatMap
-from streamlit_folium import st_folium
 import numpy as np
 
 
-def create_heatmap(df, value_col):
-    center_lat, center_lon = df['latitude'].mean(), df['longitude'].mean()
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=10)
-    heat_data = [[row['latitude'], row['longitude'], row[value_col]] for _, row in df.iterrows()]
+# Above this many points the heatmap is built from grid cells instead of raw points
+HEATMAP_BIN_THRESHOLD = 5000
+
+
+def create_heatmap(df, value_col, cell_size=0.001):
+    import folium
+    from folium.plugins import HeatMap
+    if df.empty:
+        return folium.Map(location=[0, 0], zoom_start=2, prefer_canvas=True)
+    center_lat, center_lon = df[['latitude', 'longitude']].to_numpy().mean(axis=0)
+    m = folium.Map(location=[center_lat, center_lon], zoom_start=10, prefer_canvas=True)
+    if len(df) > HEATMAP_BIN_THRESHOLD:
+        # ~100m cells; leaflet.heat adds up overlapping points, so each cell carries the summed weight
+        df = spatial_bin(df, [value_col], cell_size=cell_size)
+        df[value_col] = df[value_col] * df['count']
+    # Plain nested lists straight from the columns, no per-row Series. Rounded to ~1m positions
+    # and 4-decimal weights so the serialized payload carries no float noise digits
+    values = df[['latitude', 'longitude', value_col]].to_numpy(dtype=np.float64)
+    heat_data = np.column_stack([np.round(values[:, :2], 5), np.round(values[:, 2], 4)]).tolist()
     HeatMap(heat_data, radius=25, blur=15).add_to(m)
     return m
 
+# Browser-side marker factory for the segment map. Each data row is
+# [lat, lon, segment index, strategy index, affinity, popularity]; colors and
+# strategy names are sent once instead of with every marker.
+_SEGMENT_MARKER_JS = """
+(function () {
+    var colors = %(colors)s;
+    var strategies = %(strategies)s;
+    return function (row) {
+        var color = colors[row[2]];
+        var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+            radius: 8, color: color, fillColor: color, fillOpacity: 0.8
+        });
+        // Popup HTML is only built when a marker is opened
+        marker.bindPopup(function () {
+            return '<b>' + strategies[row[3]] + '</b><br>' +
+                'Affinity: ' + row[4].toFixed(3) + '<br>' +
+                'Popularity: ' + row[5].toFixed(3);
+        });
+        marker.bindTooltip(strategies[row[3]]);
+        return marker;
+    };
+})()
+"""
+
+
 def create_segment_map(df):
-    center_lat, center_lon = df['latitude'].mean(), df['longitude'].mean()
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=10)
+    import folium
+    from folium.plugins import FastMarkerCluster
+    if df.empty:
+        return folium.Map(location=[0, 0], zoom_start=2, prefer_canvas=True)
+    center_lat, center_lon = df[['latitude', 'longitude']].to_numpy().mean(axis=0)
+    m = folium.Map(location=[center_lat, center_lon], zoom_start=10, prefer_canvas=True)
     
     colors = {'HA-HP': '#00FF00', 'HA-LP': '#0000FF', 'LA-HP': '#FFFF00', 'LA-LP': '#FF0000'}
     
-    for _, row in df.iterrows():
-        popup_text = f"""
-        <b>{row['strategy']}</b><br>
-        Affinity: {row['affinity']:.3f}<br>
-        Popularity: {row['popularity']:.3f}
-        """
-        
-        folium.CircleMarker(
-            [row['latitude'], row['longitude']],
-            radius=8,
-            color=colors[row['segment']],
-            fillColor=colors[row['segment']],
-            fillOpacity=0.8,
-            popup=popup_text
-        ).add_to(m)
+    # Factorize the label columns so each row carries small integer codes
+    segment_codes, segments = pd.factorize(df['segment'].fillna('Unknown'))
+    strategy_codes, strategies = pd.factorize(df['strategy'].fillna('Unknown'))
+    coords = np.round(df[['latitude', 'longitude']].to_numpy(dtype=np.float64), 5).tolist()
+    scores = np.round(df[['affinity', 'popularity']].to_numpy(dtype=np.float64), 3).tolist()
+    data = [[*xy, seg, strat, *sc] for xy, seg, strat, sc
+            in zip(coords, segment_codes.tolist(), strategy_codes.tolist(), scores)]
+    callback = _SEGMENT_MARKER_JS % {
+        'colors': json.dumps([colors.get(segment, '#808080') for segment in segments]),
+        'strategies': json.dumps(list(strategies)),
+    }
+    # All markers go out as one data array in a single layer; clustering only kicks in when zoomed out
+    FastMarkerCluster(data, callback=callback, options={
+        'disableClusteringAtZoom': 10,
+        'chunkedLoading': True,
+    }).add_to(m)
     return m
 
 
-def process_data(conservative_df,progressive_df):
+def spatial_bin(df, value_cols, cell_size=0.005):
+    # Collapse points into square grid cells (~500m at the default size), averaging location and values
+    cell_lat = np.floor(df['latitude'].to_numpy() / cell_size).astype(np.int64)
+    cell_lon = np.floor(df['longitude'].to_numpy() / cell_size).astype(np.int64)
+    grouped = df[['latitude', 'longitude', *value_cols]].groupby([cell_lat, cell_lon], sort=False)
+    binned = grouped.mean()
+    binned['count'] = grouped.size()
+    return binned.reset_index(drop=True)
 
-    conservative_df1=conservative_df.copy()
-    progressive_df1=progressive_df.copy()
 
-    conservative_df1.rename({'affinity':'conservative_affinity','popularity':'conservative_popularity'},axis=1,inplace=True)
-    progressive_df1.rename({'affinity':'progressive_affinity','popularity':'progressive_popularity'},axis=1,inplace=True)
+def quantize_coordinates(df, scale=1e5):
+    # Integer join keys on a 5-decimal (~1m) grid: exact matches and narrower hash keys than raw floats
+    lat_q = np.rint(df['latitude'].to_numpy() * scale).astype(np.int32)
+    lon_q = np.rint(df['longitude'].to_numpy() * scale).astype(np.int32)
+    return lat_q, lon_q
+
+
+def process_data(conservative_df,progressive_df):
+
+    # rename returns a new frame, so the inputs stay untouched without copying them first;
+    # both frames are indexed on quantized location for the join
+    conservative_df1=conservative_df.rename(columns={'affinity':'conservative_affinity','popularity':'conservative_popularity'})
+    progressive_df1=progressive_df.rename(columns={'affinity':'progressive_affinity','popularity':'progressive_popularity'})
+    conservative_df1=conservative_df1.set_index(list(quantize_coordinates(conservative_df1)))
+    progressive_df1=progressive_df1.set_index(list(quantize_coordinates(progressive_df1)))
 
-    df2=pd.merge(conservative_df1,progressive_df1[['latitude', 'longitude', 'progressive_affinity', 'progressive_popularity']],
-                              on=['latitude', 'longitude'], how='inner')
-    df2['conservative_net_popularity']=(df2['conservative_popularity']-df2['progressive_popularity'])*100
-    df2['progressive_net_popularity']=(df2['progressive_popularity']-df2['conservative_popularity'])*100
+    df2=conservative_df1.join(progressive_df1[['progressive_affinity', 'progressive_popularity']],
+                              how='inner').reset_index(drop=True)
+    # One subtraction; the progressive view is its negation
+    net=(df2['conservative_popularity'].to_numpy()-df2['progressive_popularity'].to_numpy())*100
+    df2['conservative_net_popularity']=net
+    df2['progressive_net_popularity']=-net
     
 
     return df2
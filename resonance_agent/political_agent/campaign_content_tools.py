@@ -1,15 +1,24 @@
 # campaign_content_generation/campaign_content_tools.py
+import asyncio
+import functools
+import hashlib
+import html
 import logging
 import json
+import re
 import uuid
 import io
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional, Any
 from datetime import datetime
+from types import MappingProxyType
+import numpy as np
 from google.adk.tools import ToolContext
 from google.genai import types
 import vertexai
 from vertexai.preview.vision_models import ImageGenerationModel
 from vertexai.generative_models import GenerativeModel, GenerationConfig
+from google.api_core import exceptions as gcs_exceptions
 from google.cloud import storage
 
 from .config import Modelconfig, SecretConfig
@@ -26,300 +35,116 @@ vertexai.init(project=project_id, location=location)
 # GCS bucket for campaign images
 CAMPAIGN_IMAGES_BUCKET = f"{project_id}-campaign-content"
 
-async def restore_candidate_info_from_artifacts(
-    tool_context: ToolContext
-) -> Dict[str, Any]:
-    """
-    Restore candidate information from artifacts when state is lost.
-    
-    Returns:
-        Dict with restored candidate information
-    """
-    
-    try:
-        step_logger.info("🔄 Attempting to restore candidate info from artifacts...")
-        
-        # Try to get artifact filename from state
-        artifact_filename = tool_context.state.get("temp:candidate_analysis_artifact")
-        
-        if not artifact_filename:
-            # Look for any analysis artifacts in the session
-            try:
-                artifacts = await tool_context.list_artifacts()
-                analysis_artifacts = [a for a in artifacts if 'candidate_analysis' in a.lower()]
-                if analysis_artifacts:
-                    artifact_filename = analysis_artifacts[-1]  # Get most recent
-                    step_logger.info(f"🔍 Found analysis artifact: {artifact_filename}")
-            except:
-                pass
-        
-        if not artifact_filename:
-            return {
-                "success": False,
-                "message": "No candidate analysis artifacts found"
-            }
-        
-        # Try to load the artifact and extract candidate info
-        try:
-            artifact = await tool_context.load_artifact(filename=artifact_filename)
-            if artifact and artifact.inline_data:
-                # Parse filename to extract candidate info (as fallback)
-                # Format: candidate_analysis_{candidate}_{location}.pkl
-                filename_parts = artifact_filename.replace('.pkl', '').split('_')
-                if len(filename_parts) >= 3:
-                    candidate_name_part = filename_parts[2]  # candidate name
-                    candidate_name = candidate_name_part.replace('_', ' ').title()
-                    
-                    step_logger.info(f"🎯 Restored candidate name from filename: {candidate_name}")
-                    
-                    return {
-                        "success": True,
-                        "candidate_name": candidate_name,
-                        "candidate_base": "progressive",  # Default assumption
-                        "source": "artifact_filename"
-                    }
-        except Exception as e:
-            step_logger.warning(f"Failed to load artifact {artifact_filename}: {e}")
-        
-        return {
-            "success": False,
-            "message": "Could not restore candidate info from artifacts"
-        }
-        
-    except Exception as e:
-        step_logger.error(f"Error restoring candidate info: {e}")
-        return {
-            "success": False,
-            "message": f"Error during restoration: {str(e)}"
-        }
 
+@functools.lru_cache(maxsize=4)
+def _get_text_model(model_name: str, temperature: float, max_tokens: int) -> GenerativeModel:
+    """Return a JSON-output GenerativeModel, built once per configuration."""
+    return GenerativeModel(
+        model_name,
+        generation_config=GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+            response_mime_type="application/json"
+        )
+    )
 
-async def collect_campaign_inputs(
-    tool_context: ToolContext,
-    campaign_goal: str,
-    call_to_action: str,
-    emotional_tone: str,
-    platform_type: str,
-    key_message: Optional[str] = None,
-    candidate_name: Optional[str] = None,
-    candidate_base: Optional[str] = None
-) -> Dict[str, Any]:
-    """
-    Collect campaign manager inputs and prepare for content generation.
-    
-    Args:
-        campaign_goal: The goal of this campaign (e.g., fundraising, awareness, volunteer recruitment)
-        call_to_action: What action you want people to take (e.g., donate, RSVP, share)
-        emotional_tone: The emotional tone (e.g., hopeful, urgent, inspiring, humorous)
-        platform_type: Platform for the content (social media, direct mail, sms, email)
-        key_message: Optional key message to communicate
-        candidate_name: Optional candidate name (if state is lost)
-        candidate_base: Optional candidate base (if state is lost)
-    
-    Returns:
-        Dict with campaign inputs saved to context
-    """
-    
-    try:
-        step_logger.info("📝 Collecting campaign manager inputs...")
-        
-        # Validate required inputs
-        required_fields = {
-            "campaign_goal": campaign_goal,
-            "call_to_action": call_to_action, 
-            "emotional_tone": emotional_tone,
-            "platform_type": platform_type
-        }
-        
-        missing_fields = [field for field, value in required_fields.items() if not value or value.strip() == ""]
-        if missing_fields:
-            return {
-                "status": "error",
-                "message": f"Missing required fields: {', '.join(missing_fields)}",
-                "required_fields": list(required_fields.keys())
-            }
-        
-        # Try to get candidate info from multiple sources
-        metadata = tool_context.state.get("temp:analysis_metadata", {})
-        
-        # First try from state
-        retrieved_candidate_name = metadata.get('candidate_name')
-        retrieved_candidate_base = metadata.get('candidate_base')
-        
-        # If not in state, try from function parameters  
-        if not retrieved_candidate_name and candidate_name:
-            retrieved_candidate_name = candidate_name
-            step_logger.info("📝 Using candidate name from parameters")
-            
-        if not retrieved_candidate_base and candidate_base:
-            retrieved_candidate_base = candidate_base
-            step_logger.info("📝 Using candidate base from parameters")
-            
-        # If still not found, try to restore from artifacts
-        if not retrieved_candidate_name:
-            restored_info = await restore_candidate_info_from_artifacts(tool_context)
-            if restored_info['success']:
-                retrieved_candidate_name = restored_info['candidate_name']
-                retrieved_candidate_base = restored_info['candidate_base']
-                step_logger.info("📝 Restored candidate info from artifacts")
-        
-        if not retrieved_candidate_name:
-            return {
-                "status": "error",
-                "message": "No candidate information found. Please provide candidate_name and candidate_base parameters, or run create_candidate_analysis first.",
-                "suggestion": "Try: collect_campaign_inputs(..., candidate_name='Your Candidate', candidate_base='progressive')"
-            }
-        
-        # Save campaign inputs to state with robust persistence
-        campaign_inputs = {
-            "campaign_goal": campaign_goal.strip(),
-            "call_to_action": call_to_action.strip(),
-            "emotional_tone": emotional_tone.strip(),
-            "platform_type": platform_type.strip(),
-            "key_message": key_message.strip() if key_message else "",
-            "candidate_name": retrieved_candidate_name,
-            "candidate_base": retrieved_candidate_base,
-            "collected_timestamp": datetime.now().isoformat()
-        }
-        
-        # Save to state with multiple keys for persistence
-        tool_context.state['campaign_inputs'] = campaign_inputs
-        
-        # Also save candidate info separately for future use
-        tool_context.state['candidate_name'] = retrieved_candidate_name
-        tool_context.state['candidate_base'] = retrieved_candidate_base
-        
-        # Update analysis metadata if it was restored
-        if not metadata.get('candidate_name'):
-            tool_context.state["temp:analysis_metadata"] = {
-                "candidate_name": retrieved_candidate_name,
-                "candidate_base": retrieved_candidate_base,
-                "location": metadata.get('location', 'Unknown'),
-                "age": metadata.get('age'),
-                "gender": metadata.get('gender'),
-                "tag_names": metadata.get('tag_names', [])
-            }
-        
-        step_logger.info(f"✅ Campaign inputs collected for {retrieved_candidate_name}")
-        step_logger.info(f"   🎯 Goal: {campaign_goal}")
-        step_logger.info(f"   📱 Platform: {platform_type}")
-        step_logger.info(f"   🎭 Tone: {emotional_tone}")
-        
-        return {
-            "status": "success",
-            "message": f"Campaign inputs collected for {retrieved_candidate_name}",
-            "campaign_inputs": campaign_inputs,
-            "candidate_info_source": "state" if metadata.get('candidate_name') else "parameters/artifacts",
-            "next_steps": [
-                "Inputs ready for content generation",
-                "Use generate_campaign_content to create personalized messages"
-            ]
-        }
-        
-    except Exception as e:
-        logger.error(f"Error collecting campaign inputs: {e}")
-        return {
-            "status": "error",
-            "message": f"Failed to collect campaign inputs: {str(e)}"
-        }
 
+@functools.lru_cache(maxsize=4)
+def _get_image_model(model_name: str) -> ImageGenerationModel:
+    """Return the Imagen model, loaded once per model name."""
+    return ImageGenerationModel.from_pretrained(model_name)
 
-async def generate_campaign_content(
-    tool_context: ToolContext
-) -> Dict[str, Any]:
-    """
-    Generate personalized campaign content using cultural insights and campaign inputs.
-    
-    Returns:
-        Dict with generated campaign content variants and image concept
-    """
-    
-    try:
-        step_logger.info("🎨 Generating personalized campaign content...")
-        
-        # Get campaign inputs with fallback
-        campaign_inputs = tool_context.state.get('campaign_inputs')
-        
-        if not campaign_inputs:
-            # Try to restore candidate info if inputs are missing
-            candidate_name = tool_context.state.get('candidate_name')
-            candidate_base = tool_context.state.get('candidate_base')
-            
-            if not candidate_name:
-                restored_info = await restore_candidate_info_from_artifacts(tool_context)
-                if restored_info['success']:
-                    candidate_name = restored_info['candidate_name']
-                    candidate_base = restored_info['candidate_base']
-            
-            return {
-                "status": "error",
-                "message": "No campaign inputs found. Please run collect_campaign_inputs first.",
-                "available_candidate_info": {
-                    "candidate_name": candidate_name,
-                    "candidate_base": candidate_base
-                } if candidate_name else None,
-                "suggestion": f"Try: collect_campaign_inputs(campaign_goal='awareness', call_to_action='share', emotional_tone='hopeful', platform_type='social media'{f", candidate_name='{candidate_name}'" if candidate_name else ''})"
-            }
-        
-        # Get cultural insights from state
-        all_insights = tool_context.state.get('all_content_insights', {})
-        if not all_insights:
-            return {
-                "status": "error", 
-                "message": "No cultural insights found. Please run generate_content_insights first."
-            }
-        
-        # Get identified locations info
-        identified_locations = tool_context.state.get('identified_locations', {})
-        location_tag = identified_locations.get('tag', 'Target Audience')
-        
-        step_logger.info(f"🎯 Creating content for: {location_tag}")
-        step_logger.info(f"📊 Using insights: {list(all_insights.keys())}")
-        
-        # Prepare cultural preferences for prompt
-        cultural_prefs = {
-            "movies": all_insights.get("movies", "No movie insights available"),
-            "brands": all_insights.get("brands", "No brand insights available"), 
-            "artists": all_insights.get("artists", "No artist insights available"),
-            "tv_shows": all_insights.get("tv_shows", "No TV show insights available"),
-            "tags": all_insights.get("tags", "No tag insights available"),
-            "places": all_insights.get("place_insights", "No place insights available")
-        }
-        
-        # Build the content generation prompt
-        content_prompt = f"""You are an AI campaign strategist. Create a political campaign ad tailored to a target audience using their cultural preferences and campaign goals.
+
+# Cleared when the bucket turns out to use uniform bucket-level access
+_object_acls_enabled = True
+
+
+@functools.lru_cache(maxsize=1)
+def _get_campaign_bucket() -> storage.Bucket:
+    """Return the campaign images bucket on a shared, lazily created GCS client."""
+    return storage.Client(project=project_id).bucket(CAMPAIGN_IMAGES_BUCKET)
+
+
+def _cultural_preferences(all_insights: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the cultural preferences used for content generation out of the content insights."""
+    return {
+        "movies": all_insights.get("movies", "No movie insights available"),
+        "brands": all_insights.get("brands", "No brand insights available"), 
+        "artists": all_insights.get("artists", "No artist insights available"),
+        "tv_shows": all_insights.get("tv_shows", "No TV show insights available"),
+        "tags": all_insights.get("tags", "No tag insights available"),
+        "places": all_insights.get("place_insights", "No place insights available")
+    }
+
+
+def _esc(value: Any) -> str:
+    """HTML-escape a user or model supplied value for the campaign package."""
+    return html.escape(str(value))
+
+
+def _digest(value: Any) -> str:
+    """Short stable digest of a JSON-serializable value."""
+    return hashlib.blake2b(json.dumps(value, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+
+# Lowercased names go through one translate pass: spaces to underscores, dots dropped
+_FILENAME_TABLE = str.maketrans({" ": "_", ".": None})
+
+
+def _filename_slug(name: str) -> str:
+    """Filename-safe form of a candidate name or platform."""
+    return name.lower().translate(_FILENAME_TABLE)
+
+
+_DOUBLE_SLASH_RE = re.compile(r'(?<=\.com)/{2,}')
+
+
+def _clean_gcs_url(url: str) -> str:
+    """Turn a gs:// or double-slashed storage URL into a public https URL."""
+    if url.startswith("gs://"):
+        url = url.replace("gs://", "https://storage.googleapis.com/", 1)
+    return _DOUBLE_SLASH_RE.sub('/', url)
+
+
+# Recent generations keyed by prompt digest, oldest evicted first. The raw model
+# text is kept and parsed on every hit so no session shares a mutable result
+CONTENT_CACHE_SIZE = 128
+_CONTENT_CACHE: "OrderedDict[str, str]" = OrderedDict()
+
+# Content generation prompt, filled with str.format_map (literal JSON braces are doubled)
+_CONTENT_PROMPT_TEMPLATE = """You are an AI campaign strategist. Create a political campaign ad tailored to a target audience using their cultural preferences and campaign goals.
 
 ### Cultural Preferences of Target Audience
-Movies they like: {cultural_prefs['movies']}
+Movies they like: {movies}
 
-Brands they follow: {cultural_prefs['brands']}
+Brands they follow: {brands}
 
-Artists/Musicians they enjoy: {cultural_prefs['artists']}
+Artists/Musicians they enjoy: {artists}
 
-TV Shows they watch: {cultural_prefs['tv_shows']}
+TV Shows they watch: {tv_shows}
 
-Interest Tags: {cultural_prefs['tags']}
+Interest Tags: {tags}
 
-Places they like: {cultural_prefs['places']}
+Places they like: {places}
 
 ### Campaign Context
-Candidate: {campaign_inputs['candidate_name']} ({campaign_inputs['candidate_base']})
-Key message to communicate: {campaign_inputs['key_message'] or 'None specified'}
+Candidate: {candidate_name} ({candidate_base})
+Key message to communicate: {key_message}
 
 ### Campaign Manager Inputs  
-Goal of this post: {campaign_inputs['campaign_goal']}
-Call to action: {campaign_inputs['call_to_action']}
-Emotional tone: {campaign_inputs['emotional_tone']}
-Platform type: {campaign_inputs['platform_type']}
+Goal of this post: {campaign_goal}
+Call to action: {call_to_action}
+Emotional tone: {emotional_tone}
+Platform type: {platform_type}
 
 ### Task:
 Using the above cultural preferences and campaign details:
 
 1. Write **3 variants of ad copy** (short, medium, long) that resonate with this audience's cultural touchpoints.
 2. Suggest an **image concept** (describe style, elements, cultural references).
-3. Ensure tone matches {campaign_inputs['emotional_tone']} and include appropriate legal disclaimer.
+3. Ensure tone matches {emotional_tone} and include appropriate legal disclaimer.
 4. Optimize language and references to feel natural for this cultural group (no pandering).
-5. Make it platform-ready for {campaign_inputs['platform_type']}.
+5. Make it platform-ready for {platform_type}.
 
 Format your response as JSON with this structure:
 {{
@@ -328,277 +153,20 @@ Format your response as JSON with this structure:
     "long_copy": "Extended version (5+ sentences)",
     "image_concept": "Detailed description of image style and elements",
     "cultural_connections": ["list", "of", "cultural", "references", "used"],
-    "platform_optimization": "How this is optimized for {campaign_inputs['platform_type']}",
+    "platform_optimization": "How this is optimized for {platform_type}",
     "legal_disclaimer": "Required legal text"
 }}
 """
-        
-        # Generate content using Gemini
-        model = GenerativeModel(
-            Modelconfig.flash_model,
-            generation_config=GenerationConfig(
-                temperature=0.7,  # Higher for creativity
-                max_output_tokens=4000,
-                response_mime_type="application/json"
-            )
-        )
-        
-        step_logger.info("🧠 Generating content with cultural intelligence...")
-        response = model.generate_content(content_prompt)
-        
-        if not response.text:
-            return {
-                "status": "error",
-                "message": "Empty response from content generation model"
-            }
-        
-        # Parse the generated content
-        generated_content = json.loads(response.text.strip())
-        
-        # Save generated content to state
-        campaign_content = {
-            "generated_content": generated_content,
-            "cultural_preferences_used": cultural_prefs,
-            "campaign_inputs_used": campaign_inputs,
-            "location_tag": location_tag,
-            "generation_timestamp": datetime.now().isoformat()
-        }
-        
-        tool_context.state['campaign_content'] = campaign_content
-        
-        step_logger.info("✅ Campaign content generated successfully")
-        step_logger.info(f"   📝 3 copy variants created")
-        step_logger.info(f"   🎨 Image concept developed")
-        step_logger.info(f"   🎯 Optimized for {campaign_inputs['platform_type']}")
-        
-        return {
-            "status": "success",
-            "message": f"Campaign content generated for {campaign_inputs['candidate_name']}",
-            "generated_content": generated_content,
-            "cultural_connections": generated_content.get("cultural_connections", []),
-            "platform_optimization": generated_content.get("platform_optimization", ""),
-            "content_summary": {
-                "target_audience": location_tag,
-                "platform": campaign_inputs['platform_type'],
-                "tone": campaign_inputs['emotional_tone'],
-                "goal": campaign_inputs['campaign_goal']
-            },
-            "next_steps": [
-                "Content ready for review",
-                "Use generate_campaign_image to create visual content",
-                "Review and approve before deployment"
-            ]
-        }
-        
-    except Exception as e:
-        logger.error(f"Error generating campaign content: {e}")
-        return {
-            "status": "error",
-            "message": f"Failed to generate campaign content: {str(e)}"
-        }
-
-
-async def generate_campaign_image(
-    tool_context: ToolContext,
-    image_style: Optional[str] = None
-) -> Dict[str, Any]:
-    """
-    Generate campaign image using Imagen based on the content and cultural insights.
-    
-    Args:
-        image_style: Optional override for image style (defaults to platform-appropriate)
-    
-    Returns:
-        Dict with generated image info and download URL
-    """
-    
-    try:
-        step_logger.info("🎨 Generating campaign image with Imagen...")
-        
-        # Get campaign content
-        campaign_content = tool_context.state.get('campaign_content')
-        if not campaign_content:
-            return {
-                "status": "error",
-                "message": "No campaign content found. Please run generate_campaign_content first."
-            }
-        
-        generated_content = campaign_content['generated_content']
-        campaign_inputs = campaign_content['campaign_inputs_used']
-        
-        # Get image concept from generated content
-        base_image_concept = generated_content.get('image_concept', '')
-        
-        # Determine platform-specific image requirements
-        platform_specs = get_platform_image_specs(campaign_inputs['platform_type'])
-        
-        # Build enhanced image prompt
-        style_guidance = image_style or platform_specs['style']
-        
-        enhanced_prompt = f"""
-{base_image_concept}
-
-Style requirements: {style_guidance}
-Aspect ratio: {platform_specs['aspect_ratio']}
-Campaign context: Political campaign for {campaign_inputs['candidate_name']}
-Tone: {campaign_inputs['emotional_tone']}
-Platform: {campaign_inputs['platform_type']}
-
-Additional requirements:
-- Professional political campaign aesthetic
-- Clear, engaging composition  
-- Appropriate for {campaign_inputs['platform_type']} platform
-- {campaign_inputs['emotional_tone']} emotional tone
-- High quality, campaign-ready image
-- No text overlay (will be added separately)
-- DO NOT CREATE IMAGES OF A SINGLE PERSON
-- IMAGE CREATED SHOULD NOT BE SINGLING OUT ANY RACE
-- DO NOT CREATE IMAGES OF THE CANDIDATE. IMAGES GENERATED SHOULD BE OF A THEME THAN A SINGLE PERSON
-
-"""
-        
-        step_logger.info(f"🎯 Generating {platform_specs['aspect_ratio']} image for {campaign_inputs['platform_type']}")
-        
-        # Initialize Imagen model
-        image_model = ImageGenerationModel.from_pretrained(Modelconfig.imagen4_fast)
-        
-        # Generate image with retry logic
-        max_retries = 2
-        for attempt in range(max_retries):
-            try:
-                step_logger.info(f"🎨 Image generation attempt {attempt + 1}/{max_retries}")
-                
-                response = image_model.generate_images(
-                    prompt=enhanced_prompt,
-                    number_of_images=1,
-                    aspect_ratio=platform_specs['aspect_ratio'],
-                    safety_filter_level="allow_most",
-                    person_generation="allow_adult",
-                    add_watermark=False
-                )
-                
-                if response.images and len(response.images) > 0:
-                    image = response.images[0]
-                    
-                    # Save image to GCS
-                    image_filename = f"campaign_{campaign_inputs['candidate_name'].lower().replace(' ', '_')}_{uuid.uuid4().hex[:8]}.png"
-                    
-                    # Convert PIL image to bytes
-                    img_byte_arr = io.BytesIO()
-                    image._pil_image.save(img_byte_arr, format='PNG')
-                    image_bytes = img_byte_arr.getvalue()
-                    
-                    # Upload to GCS
-                    gcs_url = await upload_image_to_gcs(image_bytes, image_filename)
-                    
-                    # Save image info to state
-                    image_info = {
-                        "image_filename": image_filename,
-                        "gcs_url": gcs_url,
-                        "image_concept": base_image_concept,
-                        "enhanced_prompt": enhanced_prompt,
-                        "platform_specs": platform_specs,
-                        "style_used": style_guidance,
-                        "generation_timestamp": datetime.now().isoformat(),
-                        "candidate": campaign_inputs['candidate_name'],
-                        "platform": campaign_inputs['platform_type']
-                    }
-                    
-                    tool_context.state['campaign_image'] = image_info
-                    
-                    step_logger.info(f"✅ Campaign image generated successfully")
-                    step_logger.info(f"   📁 Saved as: {image_filename}")
-                    step_logger.info(f"   🔗 GCS URL: {gcs_url}")
-
-                    clean_image_url = None
-                    if gcs_url:
-                        clean_image_url = gcs_url
-                        if clean_image_url.startswith("gs://"):
-                            clean_image_url = clean_image_url.replace("gs://", "https://storage.googleapis.com/")
-                        while '.com//' in clean_image_url:
-                            clean_image_url = clean_image_url.replace('.com//', '.com/')
-                    
-                    return {
-                        "status": "success",
-                        "message": f"Campaign image generated for {campaign_inputs['candidate_name']}",
-                        "image_info": image_info,
-                        "download_url": clean_image_url,
-                        "platform_optimized": campaign_inputs['platform_type'],
-                        "aspect_ratio": platform_specs['aspect_ratio'],
-                        "style_applied": style_guidance,
-                        "next_steps": [
-                            f"Image ready at: {clean_image_url}",
-                            "Review image quality and campaign alignment",
-                            "Download for campaign deployment"
-                        ]
-                    }
-                else:
-                    logger.warning(f"No image generated on attempt {attempt + 1}")
-                    
-            except Exception as e:
-                logger.warning(f"Image generation attempt {attempt + 1} failed: {e}")
-                if attempt == max_retries - 1:
-                    raise e
-        
-        return {
-            "status": "error",
-            "message": "Failed to generate image after multiple attempts"
-        }
-        
-    except Exception as e:
-        logger.error(f"Error generating campaign image: {e}")
-        return {
-            "status": "error",
-            "message": f"Failed to generate campaign image: {str(e)}"
-        }
-
 
-async def create_campaign_package(
-    tool_context: ToolContext
-) -> Dict[str, Any]:
-    """
-    Create a complete campaign package with content and image ready for deployment as HTML.
-    
-    Returns:
-        Dict with complete campaign package as downloadable HTML artifact
-    """
-    
-    try:
-        step_logger.info("📦 Creating complete campaign package...")
-        
-        # Get campaign content and image
-        campaign_content = tool_context.state.get('campaign_content')
-        campaign_image = tool_context.state.get('campaign_image')
-        campaign_inputs = tool_context.state.get('campaign_inputs')
-        
-        if not campaign_content:
-            return {
-                "status": "error",
-                "message": "No campaign content found. Please generate content first."
-            }
-        
-        generated_content = campaign_content['generated_content']
-        cultural_prefs = campaign_content['cultural_preferences_used']
-        location_tag = campaign_content['location_tag']
-        
-        # Build comprehensive campaign package as HTML
-        package_date = datetime.now().strftime("%B %d, %Y at %I:%M %p")
 
-        clean_image_url = None
-        if campaign_image:
-            clean_image_url = campaign_image['gcs_url']
-            if clean_image_url.startswith("gs://"):
-                clean_image_url = clean_image_url.replace("gs://", "https://storage.googleapis.com/")
-            while '.com//' in clean_image_url:
-                clean_image_url = clean_image_url.replace('.com//', '.com/')
-        
-        # HTML structure with embedded CSS
-        html_package = f"""<!DOCTYPE html>
+# Static parts of the campaign package HTML, filled with str.format_map
+# (literal CSS braces are doubled)
+_PACKAGE_HTML_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Campaign Package - {campaign_inputs['candidate_name']}</title>
+    <title>Campaign Package - {candidate_name}</title>
     <style>
         body {{
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
@@ -748,7 +316,7 @@ async def create_campaign_package(
 </head>
 <body>
     <div class="header">
-        <h1>{campaign_inputs['candidate_name']} Campaign Package</h1>
+        <h1>{candidate_name} Campaign Package</h1>
         <div class="subtitle">{location_tag}</div>
     </div>
 
@@ -759,15 +327,15 @@ async def create_campaign_package(
         </div>
         <div class="meta-item">
             <div class="meta-label">Platform</div>
-            <div class="meta-value">{campaign_inputs['platform_type']}</div>
+            <div class="meta-value">{platform_type}</div>
         </div>
         <div class="meta-item">
             <div class="meta-label">Goal</div>
-            <div class="meta-value">{campaign_inputs['campaign_goal']}</div>
+            <div class="meta-value">{campaign_goal}</div>
         </div>
         <div class="meta-item">
             <div class="meta-label">Tone</div>
-            <div class="meta-value">{campaign_inputs['emotional_tone']}</div>
+            <div class="meta-value">{emotional_tone}</div>
         </div>
     </div>
 
@@ -776,151 +344,803 @@ async def create_campaign_package(
             <span class="emoji">📋</span>Campaign Copy Variants
         </div>
         <div class="section-content">
-            <div class="copy-variant">
-                <h4>Short Copy (Quick Impact)</h4>
-                <p>{generated_content.get('short_copy', 'Not available')}</p>
-            </div>
-            
-            <div class="copy-variant">
-                <h4>Medium Copy (Balanced Detail)</h4>
-                <p>{generated_content.get('medium_copy', 'Not available')}</p>
+{copy_variants}
+        </div>
+    </div>
+
+    <div class="section">
+        <div class="section-header">
+            <span class="emoji">🎯</span>Call to Action
+        </div>
+        <div class="section-content">
+            <div class="cta-box">
+                {call_to_action}
             </div>
+        </div>
+    </div>
+
+    <div class="section">
+        <div class="section-header">
+            <span class="emoji">🎨</span>Image Concept
+        </div>
+        <div class="section-content">
+            <p>{image_concept}</p>
+        </div>
+    </div>
+"""
+
+_COPY_VARIANTS = (
+    ("Short Copy (Quick Impact)", "short_copy"),
+    ("Medium Copy (Balanced Detail)", "medium_copy"),
+    ("Long Copy (Full Message)", "long_copy"),
+)
+
+_COPY_VARIANT_HTML = """            <div class="copy-variant">
+                <h4>{label}</h4>
+                <p>{text}</p>
+            </div>"""
+
+_IMAGE_SECTION_HTML = """
+    <div class="section">
+        <div class="section-header">
+            <span class="emoji">📸</span>Generated Image
+        </div>
+        <div class="section-content image-section">
+            <p><strong>Filename:</strong> {image_filename}</p>
+            <p><strong>Aspect Ratio:</strong> {aspect_ratio}</p>
+            <p><strong>Style:</strong> {style_used}</p>
             
-            <div class="copy-variant">
-                <h4>Long Copy (Full Message)</h4>
-                <p>{generated_content.get('long_copy', 'Not available')}</p>
-            </div>
+            <a href="{download_url}" class="image-download" target="_blank">
+                📥 Download High-Quality Image
+            </a>
+        </div>
+    </div>
+"""
+
+_CONNECTIONS_SECTION_HTML = """
+    <div class="section">
+        <div class="section-header">
+            <span class="emoji">🎭</span>Cultural Connections Used
+        </div>
+        <div class="section-content">
+            <div class="cultural-list">
+{connections}            </div>
         </div>
     </div>
+"""
+
+_PLATFORM_SECTION_HTML = """
+    <div class="section">
+        <div class="section-header">
+            <span class="emoji">📱</span>Platform Optimization
+        </div>
+        <div class="section-content">
+            <p>{platform_optimization}</p>
+        </div>
+    </div>
+"""
+
+# Each preference is cut to its first 300 characters, then escaped, before filling
+_CULTURAL_PROFILE_KEYS = ("movies", "brands", "artists", "places", "tags")
+
+_CULTURAL_PROFILE_HTML = """
+    <div class="section">
+        <div class="section-header">
+            <span class="emoji">📊</span>Target Audience Cultural Profile
+        </div>
+        <div class="section-content">
+            <div class="cultural-list">
+                <div class="cultural-item">
+                    <h4>🎬 Movie Preferences</h4>
+                    <p>{movies}...</p>
+                </div>
+                
+                <div class="cultural-item">
+                    <h4>🏢 Brand Preferences</h4>
+                    <p>{brands}...</p>
+                </div>
+                
+                <div class="cultural-item">
+                    <h4>🎵 Music/Artist Preferences</h4>
+                    <p>{artists}...</p>
+                </div>
+                <div class="cultural-item">
+                    <h4>🏢 Places</h4>
+                    <p>{places}...</p>
+                </div>
+                
+                <div class="cultural-item">
+                    <h4>🏷️ Interest Tags</h4>
+                    <p>{tags}...</p>
+                </div>
+            </div>
+        </div>
+    </div>
+"""
+
+_PACKAGE_HTML_TAIL = """
+    <div class="section">
+        <div class="section-header">
+            <span class="emoji">⚖️</span>Legal Requirements
+        </div>
+        <div class="section-content">
+            <p>{legal_disclaimer}</p>
+        </div>
+    </div>
+
+    <div class="section">
+        <div class="section-header">
+            <span class="emoji">📝</span>Deployment Checklist
+        </div>
+        <div class="section-content">
+            <ul class="checklist">
+                <li>Review all copy variants for accuracy</li>
+                <li>Approve image content and quality</li>
+                <li>Verify legal disclaimers are included</li>
+                <li>Test on target platform format</li>
+                <li>Schedule deployment timing</li>
+                <li>Monitor engagement metrics</li>
+            </ul>
+        </div>
+    </div>
+
+    <div class="footer">
+        Generated by Campaign Content Intelligence Platform<br>
+        Target Audience: {location_tag}<br>
+        Cultural Data: Qloo API Integration
+    </div>
+
+</body>
+</html>"""
+
+
+async def restore_candidate_info_from_artifacts(
+    tool_context: ToolContext
+) -> Dict[str, Any]:
+    """
+    Restore candidate information from artifacts when state is lost.
+    
+    Returns:
+        Dict with restored candidate information
+    """
+    
+    try:
+        step_logger.info("🔄 Attempting to restore candidate info from artifacts...")
+        
+        # Candidate info saved by an earlier collect_campaign_inputs needs no artifact lookup,
+        # as long as no newer analysis has been stored since
+        cached_name = tool_context.state.get("candidate_name")
+        if cached_name and tool_context.state.get("candidate_artifact") == tool_context.state.get("candidate_analysis_artifact"):
+            return {
+                "success": True,
+                "candidate_name": cached_name,
+                "candidate_base": tool_context.state.get("candidate_base") or "progressive",
+                "source": "state_cache"
+            }
+        
+        # Try to get artifact filename from state (temp: keys only live for one invocation,
+        # the session-level index survives across turns)
+        artifact_filename = (
+            tool_context.state.get("temp:candidate_analysis_artifact")
+            or tool_context.state.get("candidate_analysis_artifact")
+        )
+        
+        if not artifact_filename:
+            # Look for any analysis artifacts in the session
+            try:
+                artifacts = await tool_context.list_artifacts()
+                analysis_artifacts = [a for a in artifacts if 'candidate_analysis' in a.lower()]
+                if analysis_artifacts:
+                    artifact_filename = analysis_artifacts[-1]  # Get most recent
+                    step_logger.info(f"🔍 Found analysis artifact: {artifact_filename}")
+                    tool_context.state["candidate_analysis_artifact"] = artifact_filename
+            except:
+                pass
+        
+        if not artifact_filename:
+            return {
+                "success": False,
+                "message": "No candidate analysis artifacts found"
+            }
+        
+        # Reuse the info parsed from this artifact earlier in the session
+        restored = tool_context.state.get("restored_candidate_info")
+        if restored and restored.get("artifact_filename") == artifact_filename:
+            return {
+                "success": True,
+                "candidate_name": restored["candidate_name"],
+                "candidate_base": restored["candidate_base"],
+                "source": "artifact_filename"
+            }
+        
+        # Try to load the artifact and extract candidate info
+        try:
+            artifact = await tool_context.load_artifact(filename=artifact_filename)
+            if artifact and artifact.inline_data:
+                # Parse filename to extract candidate info (as fallback)
+                # Format: candidate_analysis_{candidate}_{location}.pkl
+                filename_parts = artifact_filename.replace('.pkl', '').split('_')
+                if len(filename_parts) >= 3:
+                    candidate_name_part = filename_parts[2]  # candidate name
+                    candidate_name = candidate_name_part.replace('_', ' ').title()
+                    
+                    step_logger.info(f"🎯 Restored candidate name from filename: {candidate_name}")
+                    
+                    tool_context.state["restored_candidate_info"] = {
+                        "artifact_filename": artifact_filename,
+                        "candidate_name": candidate_name,
+                        "candidate_base": "progressive"
+                    }
+                    
+                    return {
+                        "success": True,
+                        "candidate_name": candidate_name,
+                        "candidate_base": "progressive",  # Default assumption
+                        "source": "artifact_filename"
+                    }
+        except Exception as e:
+            step_logger.warning(f"Failed to load artifact {artifact_filename}: {e}")
+        
+        return {
+            "success": False,
+            "message": "Could not restore candidate info from artifacts"
+        }
+        
+    except Exception as e:
+        step_logger.error(f"Error restoring candidate info: {e}")
+        return {
+            "success": False,
+            "message": f"Error during restoration: {str(e)}"
+        }
+
+
+async def collect_campaign_inputs(
+    tool_context: ToolContext,
+    campaign_goal: str,
+    call_to_action: str,
+    emotional_tone: str,
+    platform_type: str,
+    key_message: Optional[str] = None,
+    candidate_name: Optional[str] = None,
+    candidate_base: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Collect campaign manager inputs and prepare for content generation.
+    
+    Args:
+        campaign_goal: The goal of this campaign (e.g., fundraising, awareness, volunteer recruitment)
+        call_to_action: What action you want people to take (e.g., donate, RSVP, share)
+        emotional_tone: The emotional tone (e.g., hopeful, urgent, inspiring, humorous)
+        platform_type: Platform for the content (social media, direct mail, sms, email)
+        key_message: Optional key message to communicate
+        candidate_name: Optional candidate name (if state is lost)
+        candidate_base: Optional candidate base (if state is lost)
+    
+    Returns:
+        Dict with campaign inputs saved to context
+    """
+    
+    try:
+        step_logger.info("📝 Collecting campaign manager inputs...")
+        
+        # Normalize inputs once, then validate the required ones
+        campaign_goal = (campaign_goal or "").strip()
+        call_to_action = (call_to_action or "").strip()
+        emotional_tone = (emotional_tone or "").strip()
+        platform_type = (platform_type or "").strip().lower()
+        key_message = (key_message or "").strip()
+        
+        required_fields = {
+            "campaign_goal": campaign_goal,
+            "call_to_action": call_to_action, 
+            "emotional_tone": emotional_tone,
+            "platform_type": platform_type
+        }
+        
+        missing_fields = [field for field, value in required_fields.items() if not value]
+        if missing_fields:
+            return {
+                "status": "error",
+                "message": f"Missing required fields: {', '.join(missing_fields)}",
+                "required_fields": list(required_fields.keys())
+            }
+        
+        # Try to get candidate info from multiple sources
+        metadata = tool_context.state.get("temp:analysis_metadata", {})
+        
+        # First try from state
+        retrieved_candidate_name = metadata.get('candidate_name')
+        retrieved_candidate_base = metadata.get('candidate_base')
+        
+        # If not in state, try from function parameters  
+        if not retrieved_candidate_name and candidate_name:
+            retrieved_candidate_name = candidate_name
+            step_logger.info("📝 Using candidate name from parameters")
+            
+        if not retrieved_candidate_base and candidate_base:
+            retrieved_candidate_base = candidate_base
+            step_logger.info("📝 Using candidate base from parameters")
+            
+        # If still not found, try to restore from artifacts
+        if not retrieved_candidate_name:
+            restored_info = await restore_candidate_info_from_artifacts(tool_context)
+            if restored_info['success']:
+                retrieved_candidate_name = restored_info['candidate_name']
+                retrieved_candidate_base = restored_info['candidate_base']
+                step_logger.info("📝 Restored candidate info from artifacts")
+        
+        if not retrieved_candidate_name:
+            return {
+                "status": "error",
+                "message": "No candidate information found. Please provide candidate_name and candidate_base parameters, or run create_candidate_analysis first.",
+                "suggestion": "Try: collect_campaign_inputs(..., candidate_name='Your Candidate', candidate_base='progressive')"
+            }
+        
+        # Save campaign inputs to state with robust persistence
+        campaign_inputs = {
+            "campaign_goal": campaign_goal,
+            "call_to_action": call_to_action,
+            "emotional_tone": emotional_tone,
+            "platform_type": platform_type,
+            "key_message": key_message,
+            "candidate_name": retrieved_candidate_name,
+            "candidate_slug": _filename_slug(retrieved_candidate_name),
+            "candidate_base": retrieved_candidate_base,
+            "collected_timestamp": datetime.now().isoformat()
+        }
+        
+        # Save to state with multiple keys for persistence, candidate info
+        # separately for future use
+        state_updates = {
+            'campaign_inputs': campaign_inputs,
+            'candidate_name': retrieved_candidate_name,
+            'candidate_base': retrieved_candidate_base,
+            # The analysis the candidate info belongs to, so a later analysis invalidates it
+            'candidate_artifact': tool_context.state.get("candidate_analysis_artifact")
+        }
+        
+        # Update analysis metadata if it was restored
+        if not metadata.get('candidate_name'):
+            state_updates["temp:analysis_metadata"] = {
+                "candidate_name": retrieved_candidate_name,
+                "candidate_base": retrieved_candidate_base,
+                "location": metadata.get('location', 'Unknown'),
+                "age": metadata.get('age'),
+                "gender": metadata.get('gender'),
+                "tag_names": metadata.get('tag_names', [])
+            }
+        
+        tool_context.state.update(state_updates)
+        
+        step_logger.info(
+            "✅ Campaign inputs collected for %s\n"
+            "   🎯 Goal: %s\n"
+            "   📱 Platform: %s\n"
+            "   🎭 Tone: %s",
+            retrieved_candidate_name, campaign_goal, platform_type, emotional_tone
+        )
+        
+        return {
+            "status": "success",
+            "message": f"Campaign inputs collected for {retrieved_candidate_name}",
+            "campaign_inputs": campaign_inputs,
+            "candidate_info_source": "state" if metadata.get('candidate_name') else "parameters/artifacts",
+            "next_steps": [
+                "Inputs ready for content generation",
+                "Use generate_campaign_content to create personalized messages"
+            ]
+        }
+        
+    except Exception as e:
+        logger.error(f"Error collecting campaign inputs: {e}")
+        return {
+            "status": "error",
+            "message": f"Failed to collect campaign inputs: {str(e)}"
+        }
+
+
+async def generate_campaign_content(
+    tool_context: ToolContext,
+    regenerate: bool = False
+) -> Dict[str, Any]:
+    """
+    Generate personalized campaign content using cultural insights and campaign inputs.
+    
+    Args:
+        regenerate: Ask the model for new variants even if identical inputs were generated before
+    
+    Returns:
+        Dict with generated campaign content variants and image concept
+    """
+    
+    try:
+        step_logger.info("🎨 Generating personalized campaign content...")
+        
+        # Get campaign inputs with fallback
+        campaign_inputs = tool_context.state.get('campaign_inputs')
+        
+        if not campaign_inputs:
+            # Try to restore candidate info if inputs are missing
+            candidate_name = tool_context.state.get('candidate_name')
+            candidate_base = tool_context.state.get('candidate_base')
+            
+            if not candidate_name:
+                restored_info = await restore_candidate_info_from_artifacts(tool_context)
+                if restored_info['success']:
+                    candidate_name = restored_info['candidate_name']
+                    candidate_base = restored_info['candidate_base']
+            
+            return {
+                "status": "error",
+                "message": "No campaign inputs found. Please run collect_campaign_inputs first.",
+                "available_candidate_info": {
+                    "candidate_name": candidate_name,
+                    "candidate_base": candidate_base
+                } if candidate_name else None,
+                "suggestion": f"Try: collect_campaign_inputs(campaign_goal='awareness', call_to_action='share', emotional_tone='hopeful', platform_type='social media'{f", candidate_name='{candidate_name}'" if candidate_name else ''})"
+            }
+        
+        # Get cultural insights from state
+        all_insights = tool_context.state.get('all_content_insights', {})
+        if not all_insights:
+            return {
+                "status": "error", 
+                "message": "No cultural insights found. Please run generate_content_insights first."
+            }
+        
+        # Get identified locations info
+        identified_locations = tool_context.state.get('identified_locations', {})
+        location_tag = identified_locations.get('tag', 'Target Audience')
+        
+        step_logger.info("🎯 Creating content for: %s\n📊 Using insights: %s", location_tag, list(all_insights))
+        
+        # Prepare cultural preferences for prompt
+        cultural_prefs = _cultural_preferences(all_insights)
+        
+        # Build the content generation prompt
+        content_prompt = _CONTENT_PROMPT_TEMPLATE.format_map({
+            **cultural_prefs,
+            "candidate_name": campaign_inputs['candidate_name'],
+            "candidate_base": campaign_inputs['candidate_base'],
+            "key_message": campaign_inputs['key_message'] or 'None specified',
+            "campaign_goal": campaign_inputs['campaign_goal'],
+            "call_to_action": campaign_inputs['call_to_action'],
+            "emotional_tone": campaign_inputs['emotional_tone'],
+            "platform_type": campaign_inputs['platform_type']
+        })
+        
+        # Identical prompts reuse the earlier generation unless new variants are requested
+        prompt_key = hashlib.blake2b(content_prompt.encode(), digest_size=16).hexdigest()
+        content_text = None if regenerate else _CONTENT_CACHE.get(prompt_key)
+        
+        if content_text is not None:
+            _CONTENT_CACHE.move_to_end(prompt_key)
+            generated_content = json.loads(content_text)
+            step_logger.info("♻️ Reusing content generated for identical inputs")
+        else:
+            # Generate content using Gemini
+            model = _get_text_model(Modelconfig.flash_model, 0.7, 4000)  # Higher temperature for creativity
+            
+            step_logger.info("🧠 Generating content with cultural intelligence...")
+            response = model.generate_content(content_prompt)
+            
+            if not response.text:
+                return {
+                    "status": "error",
+                    "message": "Empty response from content generation model"
+                }
+            
+            # Parse the generated content (before caching, so malformed output is never reused)
+            generated_content = json.loads(response.text)
+            
+            _CONTENT_CACHE[prompt_key] = response.text
+            if len(_CONTENT_CACHE) > CONTENT_CACHE_SIZE:
+                _CONTENT_CACHE.popitem(last=False)
+        
+        # Save generated content to state
+        campaign_content = {
+            "generated_content": generated_content,
+            # The insights themselves stay under all_content_insights; only point at them
+            "cultural_preferences_ref": "all_content_insights",
+            "cultural_preferences_digest": _digest(cultural_prefs),
+            "campaign_inputs_used": campaign_inputs,
+            "location_tag": location_tag,
+            "generation_timestamp": datetime.now().isoformat()
+        }
+        
+        tool_context.state['campaign_content'] = campaign_content
+        
+        step_logger.info(
+            "✅ Campaign content generated successfully\n"
+            "   📝 3 copy variants created\n"
+            "   🎨 Image concept developed\n"
+            "   🎯 Optimized for %s",
+            campaign_inputs['platform_type']
+        )
+        
+        return {
+            "status": "success",
+            "message": f"Campaign content generated for {campaign_inputs['candidate_name']}",
+            "generated_content": generated_content,
+            "cultural_connections": generated_content.get("cultural_connections", []),
+            "platform_optimization": generated_content.get("platform_optimization", ""),
+            "content_summary": {
+                "target_audience": location_tag,
+                "platform": campaign_inputs['platform_type'],
+                "tone": campaign_inputs['emotional_tone'],
+                "goal": campaign_inputs['campaign_goal']
+            },
+            "next_steps": [
+                "Content ready for review",
+                "Use generate_campaign_image to create visual content",
+                "Review and approve before deployment"
+            ]
+        }
+        
+    except Exception as e:
+        logger.error(f"Error generating campaign content: {e}")
+        return {
+            "status": "error",
+            "message": f"Failed to generate campaign content: {str(e)}"
+        }
+
+
+async def generate_campaign_image(
+    tool_context: ToolContext,
+    image_style: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Generate campaign image using Imagen based on the content and cultural insights.
+    
+    Args:
+        image_style: Optional override for image style (defaults to platform-appropriate)
+    
+    Returns:
+        Dict with generated image info and download URL
+    """
+    
+    try:
+        step_logger.info("🎨 Generating campaign image with Imagen...")
+        
+        # Get campaign content
+        campaign_content = tool_context.state.get('campaign_content')
+        if not campaign_content:
+            return {
+                "status": "error",
+                "message": "No campaign content found. Please run generate_campaign_content first."
+            }
+        
+        generated_content = campaign_content['generated_content']
+        campaign_inputs = campaign_content['campaign_inputs_used']
+        
+        # Get image concept from generated content
+        base_image_concept = generated_content.get('image_concept', '')
+        
+        # Determine platform-specific image requirements
+        platform_specs = get_platform_image_specs(campaign_inputs['platform_type'])
+        
+        # Build enhanced image prompt
+        style_guidance = image_style or platform_specs['style']
+        
+        enhanced_prompt = f"""
+{base_image_concept}
+
+Style requirements: {style_guidance}
+Aspect ratio: {platform_specs['aspect_ratio']}
+Campaign context: Political campaign for {campaign_inputs['candidate_name']}
+Tone: {campaign_inputs['emotional_tone']}
+Platform: {campaign_inputs['platform_type']}
 
-    <div class="section">
-        <div class="section-header">
-            <span class="emoji">🎯</span>Call to Action
-        </div>
-        <div class="section-content">
-            <div class="cta-box">
-                {campaign_inputs['call_to_action']}
-            </div>
-        </div>
-    </div>
+Additional requirements:
+- Professional political campaign aesthetic
+- Clear, engaging composition  
+- Appropriate for {campaign_inputs['platform_type']} platform
+- {campaign_inputs['emotional_tone']} emotional tone
+- High quality, campaign-ready image
+- No text overlay (will be added separately)
+- DO NOT CREATE IMAGES OF A SINGLE PERSON
+- IMAGE CREATED SHOULD NOT BE SINGLING OUT ANY RACE
+- DO NOT CREATE IMAGES OF THE CANDIDATE. IMAGES GENERATED SHOULD BE OF A THEME THAN A SINGLE PERSON
 
-    <div class="section">
-        <div class="section-header">
-            <span class="emoji">🎨</span>Image Concept
-        </div>
-        <div class="section-content">
-            <p>{generated_content.get('image_concept', 'Not available')}</p>
-        </div>
-    </div>
 """
+        
+        step_logger.info(f"🎯 Generating {platform_specs['aspect_ratio']} image for {campaign_inputs['platform_type']}")
+        
+        # Initialize Imagen model
+        image_model = _get_image_model(Modelconfig.imagen4_fast)
+        
+        # Generate image with retry logic
+        max_retries = 2
+        for attempt in range(max_retries):
+            try:
+                step_logger.info(f"🎨 Image generation attempt {attempt + 1}/{max_retries}")
+                
+                # Blocking SDK call, keep it off the event loop
+                response = await asyncio.to_thread(
+                    image_model.generate_images,
+                    prompt=enhanced_prompt,
+                    number_of_images=1,
+                    aspect_ratio=platform_specs['aspect_ratio'],
+                    safety_filter_level="allow_most",
+                    person_generation="allow_adult",
+                    add_watermark=False
+                )
+                
+                if response.images and len(response.images) > 0:
+                    image = response.images[0]
+                    
+                    # Save image to GCS
+                    candidate_slug = campaign_inputs.get('candidate_slug') or _filename_slug(campaign_inputs['candidate_name'])
+                    image_filename = f"campaign_{candidate_slug}_{uuid.uuid4().hex[:8]}.png"
+                    
+                    # Imagen already returns PNG bytes (its default output type);
+                    # only encode through PIL if they are missing
+                    image_bytes = image._image_bytes
+                    if not image_bytes:
+                        img_byte_arr = io.BytesIO()
+                        await asyncio.to_thread(image._pil_image.save, img_byte_arr, format='PNG', compress_level=1)
+                        image_bytes = img_byte_arr.getvalue()
+                    
+                    # Upload to GCS
+                    gcs_url = await upload_image_to_gcs(image_bytes, image_filename)
+                    
+                    # Save image info to state
+                    image_info = {
+                        "image_filename": image_filename,
+                        "gcs_url": gcs_url,
+                        "image_concept": base_image_concept,
+                        "enhanced_prompt": enhanced_prompt,
+                        "platform_specs": dict(platform_specs),
+                        "style_used": style_guidance,
+                        "generation_timestamp": datetime.now().isoformat(),
+                        "candidate": campaign_inputs['candidate_name'],
+                        "platform": campaign_inputs['platform_type']
+                    }
+                    
+                    tool_context.state['campaign_image'] = image_info
+                    
+                    step_logger.info(
+                        "✅ Campaign image generated successfully\n"
+                        "   📁 Saved as: %s\n"
+                        "   🔗 GCS URL: %s",
+                        image_filename, gcs_url
+                    )
 
-        # Add image section if available
-        if campaign_image:
-            # Use the correct URL format as mentioned by user
-            # download_url = campaign_image['gcs_url'].replace("gs://", "https://storage.googleapis.com")
-            # download_url = download_url.replace('.com//', '.com/')
-            # Step 1: Convert gs:// if present
-            # if download_url.startswith("gs://"):
-            #     download_url = download_url.replace("gs://", "https://storage.googleapis.com/")
+                    clean_image_url = _clean_gcs_url(gcs_url) if gcs_url else None
+                    
+                    return {
+                        "status": "success",
+                        "message": f"Campaign image generated for {campaign_inputs['candidate_name']}",
+                        "image_info": image_info,
+                        "download_url": clean_image_url,
+                        "platform_optimized": campaign_inputs['platform_type'],
+                        "aspect_ratio": platform_specs['aspect_ratio'],
+                        "style_applied": style_guidance,
+                        "next_steps": [
+                            f"Image ready at: {clean_image_url}",
+                            "Review image quality and campaign alignment",
+                            "Download for campaign deployment"
+                        ]
+                    }
+                else:
+                    logger.warning(f"No image generated on attempt {attempt + 1}")
+                    
+            except Exception as e:
+                logger.warning(f"Image generation attempt {attempt + 1} failed: {e}")
+                if attempt == max_retries - 1:
+                    raise e
+        
+        return {
+            "status": "error",
+            "message": "Failed to generate image after multiple attempts"
+        }
+        
+    except Exception as e:
+        logger.error(f"Error generating campaign image: {e}")
+        return {
+            "status": "error",
+            "message": f"Failed to generate campaign image: {str(e)}"
+        }
 
-            # # Step 2: Keep removing double slashes until none remain
-            # while '.com//' in download_url:
-            #     download_url = download_url.replace('.com//', '.com/')
-            download_url = clean_image_url
 
+async def create_campaign_package(
+    tool_context: ToolContext
+) -> Dict[str, Any]:
+    """
+    Create a complete campaign package with content and image ready for deployment as HTML.
+    
+    Returns:
+        Dict with complete campaign package as downloadable HTML artifact
+    """
+    
+    try:
+        step_logger.info("📦 Creating complete campaign package...")
+        
+        # Get campaign content and image
+        campaign_content = tool_context.state.get('campaign_content')
+        campaign_image = tool_context.state.get('campaign_image')
+        
+        if not campaign_content:
+            return {
+                "status": "error",
+                "message": "No campaign content found. Please generate content first."
+            }
+        
+        generated_content = campaign_content['generated_content']
+        # The inputs the content was generated from, not whatever was collected since
+        campaign_inputs = campaign_content['campaign_inputs_used']
+        # Content generated before the insights were referenced carries its own copy
+        cultural_prefs = campaign_content.get('cultural_preferences_used')
+        if cultural_prefs is None:
+            cultural_prefs = _cultural_preferences(
+                tool_context.state.get(campaign_content['cultural_preferences_ref'], {})
+            )
+            if _digest(cultural_prefs) != campaign_content.get('cultural_preferences_digest'):
+                # The copy was written against the old insights; packaging it with the new profile would mismatch
+                step_logger.warning("⚠️ Cultural insights changed since the content was generated")
+                return {
+                    "status": "error",
+                    "message": "Cultural insights changed since the content was generated. "
+                               "Run generate_campaign_content again before creating the package."
+                }
+        location_tag = campaign_content['location_tag']
+        
+        # Build comprehensive campaign package as HTML
+        package_date = datetime.now().strftime("%B %d, %Y at %I:%M %p")
 
-            html_package += f"""
-    <div class="section">
-        <div class="section-header">
-            <span class="emoji">📸</span>Generated Image
-        </div>
-        <div class="section-content image-section">
-            <p><strong>Filename:</strong> {campaign_image['image_filename']}</p>
-            <p><strong>Aspect Ratio:</strong> {campaign_image['platform_specs']['aspect_ratio']}</p>
-            <p><strong>Style:</strong> {campaign_image['style_used']}</p>
-            
-            <a href="{download_url}" class="image-download" target="_blank">
-                📥 Download High-Quality Image
-            </a>
-        </div>
-    </div>
-"""
+        clean_image_url = _clean_gcs_url(campaign_image['gcs_url']) if campaign_image else None
         
-        # Add cultural connections
+        # HTML structure with embedded CSS
+        parts = [_PACKAGE_HTML_HEAD.format_map({
+            "candidate_name": _esc(campaign_inputs['candidate_name']),
+            "location_tag": _esc(location_tag),
+            "package_date": package_date,
+            "platform_type": _esc(campaign_inputs['platform_type']),
+            "campaign_goal": _esc(campaign_inputs['campaign_goal']),
+            "emotional_tone": _esc(campaign_inputs['emotional_tone']),
+            "copy_variants": "\n            \n".join(
+                _COPY_VARIANT_HTML.format(label=label, text=_esc(generated_content.get(key, 'Not available')))
+                for label, key in _COPY_VARIANTS
+            ),
+            "call_to_action": _esc(campaign_inputs['call_to_action']),
+            "image_concept": _esc(generated_content.get('image_concept', 'Not available'))
+        })]
+
+        # Optional sections, each rendered only when it has content
         cultural_connections = generated_content.get('cultural_connections', [])
-        if cultural_connections:
-            html_package += f"""
-    <div class="section">
-        <div class="section-header">
-            <span class="emoji">🎭</span>Cultural Connections Used
-        </div>
-        <div class="section-content">
-            <div class="cultural-list">
-"""
-            for connection in cultural_connections:
-                html_package += f'                <div class="cultural-item">{connection}</div>\n'
-            
-            html_package += """            </div>
-        </div>
-    </div>
-"""
-        
-        # Add platform optimization
         platform_optimization = generated_content.get('platform_optimization', '')
-        if platform_optimization:
-            html_package += f"""
-    <div class="section">
-        <div class="section-header">
-            <span class="emoji">📱</span>Platform Optimization
-        </div>
-        <div class="section-content">
-            <p>{platform_optimization}</p>
-        </div>
-    </div>
-"""
+        optional_sections = (
+            (_IMAGE_SECTION_HTML, campaign_image and {
+                "image_filename": _esc(campaign_image['image_filename']),
+                "aspect_ratio": _esc(campaign_image['platform_specs']['aspect_ratio']),
+                "style_used": _esc(campaign_image['style_used']),
+                "download_url": _esc(clean_image_url)
+            }),
+            (_CONNECTIONS_SECTION_HTML, cultural_connections and {
+                "connections": "".join(
+                    f'                <div class="cultural-item">{_esc(connection)}</div>\n' for connection in cultural_connections
+                )
+            }),
+            (_PLATFORM_SECTION_HTML, platform_optimization and {
+                "platform_optimization": _esc(platform_optimization)
+            }),
+        )
+        for template, context in optional_sections:
+            if context:
+                parts.append(template.format_map(context))
         
         # Add cultural insights summary
-        html_package += f"""
-    <div class="section">
-        <div class="section-header">
-            <span class="emoji">📊</span>Target Audience Cultural Profile
-        </div>
-        <div class="section-content">
-            <div class="cultural-list">
-                <div class="cultural-item">
-                    <h4>🎬 Movie Preferences</h4>
-                    <p>{cultural_prefs.get('movies', 'Not available')[:300]}...</p>
-                </div>
-                
-                <div class="cultural-item">
-                    <h4>🏢 Brand Preferences</h4>
-                    <p>{cultural_prefs.get('brands', 'Not available')[:300]}...</p>
-                </div>
-                
-                <div class="cultural-item">
-                    <h4>🎵 Music/Artist Preferences</h4>
-                    <p>{cultural_prefs.get('artists', 'Not available')[:300]}...</p>
-                </div>
-                <div class="cultural-item">
-                    <h4>🏢 Places</h4>
-                    <p>{cultural_prefs.get('places', 'Not available')[:300]}...</p>
-                </div>
-                
-                <div class="cultural-item">
-                    <h4>🏷️ Interest Tags</h4>
-                    <p>{cultural_prefs.get('tags', 'Not available')[:300]}...</p>
-                </div>
-            </div>
-        </div>
-    </div>
-"""
+        profile = cultural_prefs or {}
+        parts.append(_CULTURAL_PROFILE_HTML.format_map({
+            key: _esc(str(profile.get(key, 'Not available'))[:300]) for key in _CULTURAL_PROFILE_KEYS
+        }))
 
         # Add locations section showing all analyzed coordinates
         identified_locations = tool_context.state.get("identified_locations", {})
         coordinates = identified_locations.get("coordinates", [])
         
         if coordinates:
-            html_package += f"""
+            parts.append(f"""
     <div class="section">
         <div class="section-header">
             <span class="emoji">📍</span>Analyzed Locations & Geographic Coverage
@@ -937,33 +1157,31 @@ async def create_campaign_package(
                 </div>
                 <div class="meta-item">
                     <div class="meta-label">Filter Criteria</div>
-                    <div class="meta-value">{identified_locations.get('tag', 'Custom Filter')}</div>
+                    <div class="meta-value">{_esc(identified_locations.get('tag', 'Custom Filter'))}</div>
                 </div>
             </div>
             
             <h4>📋 Filter Description:</h4>
-            <p><em>{identified_locations.get('description', 'No description available')}</em></p>
+            <p><em>{_esc(identified_locations.get('description', 'No description available'))}</em></p>
             
             <h4>🗺️ Geographic Coordinates Analyzed:</h4>
             <div style="background: #f7fafc; padding: 15px; border-radius: 6px; font-family: monospace; max-height: 300px; overflow-y: auto;">
-"""
+""")
             
             # Add coordinate list
-            for i, coord in enumerate(coordinates, 1):
-                lat, lon = coord[0], coord[1]
-                html_package += f"                <div style='margin: 3px 0;'>{i:3d}. Latitude: {lat:>10.6f}, Longitude: {lon:>11.6f}</div>\n"
+            parts.append("".join(
+                f"                <div style='margin: 3px 0;'>{i:3d}. Latitude: {lat:>10.6f}, Longitude: {lon:>11.6f}</div>\n"
+                for i, (lat, lon) in enumerate(coordinates, 1)
+            ))
             
             # Calculate geographic bounds
             if len(coordinates) > 1:
-                lats = [coord[0] for coord in coordinates]
-                lons = [coord[1] for coord in coordinates]
-                
-                min_lat, max_lat = min(lats), max(lats)
-                min_lon, max_lon = min(lons), max(lons)
+                coords = np.asarray(coordinates, dtype=np.float64)[:, :2]
+                (min_lat, min_lon), (max_lat, max_lon) = coords.min(axis=0), coords.max(axis=0)
                 center_lat = (min_lat + max_lat) / 2
                 center_lon = (min_lon + max_lon) / 2
                 
-                html_package += f"""
+                parts.append(f"""
             </div>
             
             <h4>📏 Geographic Bounds:</h4>
@@ -987,59 +1205,29 @@ async def create_campaign_package(
                     <p>Cultural insights generated using WKT polygon covering all {len(coordinates)} filtered locations</p>
                 </div>
             </div>
-"""
+""")
             else:
-                html_package += """
+                parts.append("""
             </div>
             
             <div class="cultural-item">
                 <h4>📍 Single Location Analysis</h4>
                 <p>Analysis based on individual coordinate point</p>
             </div>
-"""
+""")
             
-            html_package += """
-        </div>
-    </div>
-"""
-
-        html_package += f"""
-    <div class="section">
-        <div class="section-header">
-            <span class="emoji">⚖️</span>Legal Requirements
-        </div>
-        <div class="section-content">
-            <p>{generated_content.get('legal_disclaimer', 'Standard campaign disclaimers apply')}</p>
-        </div>
-    </div>
-
-    <div class="section">
-        <div class="section-header">
-            <span class="emoji">📝</span>Deployment Checklist
-        </div>
-        <div class="section-content">
-            <ul class="checklist">
-                <li>Review all copy variants for accuracy</li>
-                <li>Approve image content and quality</li>
-                <li>Verify legal disclaimers are included</li>
-                <li>Test on target platform format</li>
-                <li>Schedule deployment timing</li>
-                <li>Monitor engagement metrics</li>
-            </ul>
+            parts.append("""
         </div>
     </div>
+""")
 
-    <div class="footer">
-        Generated by Campaign Content Intelligence Platform<br>
-        Target Audience: {location_tag}<br>
-        Cultural Data: Qloo API Integration
-    </div>
-
-</body>
-</html>"""
+        parts.append(_PACKAGE_HTML_TAIL.format_map({
+            "legal_disclaimer": _esc(generated_content.get('legal_disclaimer', 'Standard campaign disclaimers apply')),
+            "location_tag": _esc(location_tag)
+        }))
         
         # Create artifact as HTML
-        package_bytes = html_package.encode('utf-8')
+        package_bytes = "".join(parts).encode('utf-8')
         artifact_part = types.Part(
             inline_data=types.Blob(
                 mime_type="text/html",  # Changed to HTML
@@ -1048,8 +1236,8 @@ async def create_campaign_package(
         )
         
         # Create filename with .html extension
-        safe_candidate = campaign_inputs['candidate_name'].lower().replace(' ', '_').replace('.', '')
-        safe_platform = campaign_inputs['platform_type'].lower().replace(' ', '_')
+        safe_candidate = campaign_inputs.get('candidate_slug') or _filename_slug(campaign_inputs['candidate_name'])
+        safe_platform = _filename_slug(campaign_inputs['platform_type'])
         package_filename = f"campaign_package_{safe_candidate}_{safe_platform}.html"
         
         # Save artifact
@@ -1166,62 +1354,78 @@ async def debug_campaign_state(
         }
 
 
-def get_platform_image_specs(platform_type: str) -> Dict[str, str]:
+# Read-only and shared across calls; callers copy a spec before storing it
+_PLATFORM_IMAGE_SPECS = MappingProxyType({
+    "social media": MappingProxyType({
+        "aspect_ratio": "1:1",
+        "style": "eye-catching, social media optimized, vibrant colors"
+    }),
+    "instagram": MappingProxyType({
+        "aspect_ratio": "1:1", 
+        "style": "Instagram-style, visually appealing, modern design"
+    }),
+    "facebook": MappingProxyType({
+        "aspect_ratio": "16:9",
+        "style": "Facebook-optimized, clear messaging, professional"
+    }),
+    "twitter": MappingProxyType({
+        "aspect_ratio": "16:9",
+        "style": "Twitter-style, concise visual impact, engaging"
+    }),
+    "direct mail": MappingProxyType({
+        "aspect_ratio": "4:3",
+        "style": "print-ready, high contrast, clear details"
+    }),
+    "email": MappingProxyType({
+        "aspect_ratio": "16:9", 
+        "style": "email-friendly, clear composition, professional"
+    }),
+    "sms": MappingProxyType({
+        "aspect_ratio": "1:1",
+        "style": "mobile-optimized, simple, clear messaging"
+    })
+})
+
+_DEFAULT_IMAGE_SPECS = MappingProxyType({
+    "aspect_ratio": "16:9",
+    "style": "professional campaign style, clear composition"
+})
+
+
+def get_platform_image_specs(platform_type: str) -> Mapping[str, str]:
     """Get platform-specific image specifications."""
     
-    platform_specs = {
-        "social media": {
-            "aspect_ratio": "1:1",
-            "style": "eye-catching, social media optimized, vibrant colors"
-        },
-        "instagram": {
-            "aspect_ratio": "1:1", 
-            "style": "Instagram-style, visually appealing, modern design"
-        },
-        "facebook": {
-            "aspect_ratio": "16:9",
-            "style": "Facebook-optimized, clear messaging, professional"
-        },
-        "twitter": {
-            "aspect_ratio": "16:9",
-            "style": "Twitter-style, concise visual impact, engaging"
-        },
-        "direct mail": {
-            "aspect_ratio": "4:3",
-            "style": "print-ready, high contrast, clear details"
-        },
-        "email": {
-            "aspect_ratio": "16:9", 
-            "style": "email-friendly, clear composition, professional"
-        },
-        "sms": {
-            "aspect_ratio": "1:1",
-            "style": "mobile-optimized, simple, clear messaging"
-        }
-    }
+    return _PLATFORM_IMAGE_SPECS.get(platform_type.lower(), _DEFAULT_IMAGE_SPECS)
+
+
+def _upload_image_blocking(image_bytes: bytes, filename: str) -> str:
+    """Blocking part of upload_image_to_gcs, run in a worker thread."""
+    global _object_acls_enabled
     
-    return platform_specs.get(platform_type.lower(), {
-        "aspect_ratio": "16:9",
-        "style": "professional campaign style, clear composition"
-    })
+    bucket = _get_campaign_bucket()
+    
+    # Create blob and upload
+    blob = bucket.blob(filename)
+    blob.upload_from_string(image_bytes, content_type='image/png')
+    
+    # Make blob publicly readable; buckets with uniform bucket-level access reject
+    # per-object ACLs (400), so stop asking once one has
+    if _object_acls_enabled:
+        try:
+            blob.make_public()
+        except gcs_exceptions.BadRequest as e:
+            _object_acls_enabled = False
+            logger.warning(f"Per-object ACLs unavailable on {CAMPAIGN_IMAGES_BUCKET}, relying on bucket IAM: {e}")
+    
+    return blob.public_url
 
 
 async def upload_image_to_gcs(image_bytes: bytes, filename: str) -> str:
     """Upload image to Google Cloud Storage and return public URL."""
     
     try:
-        # Initialize GCS client
-        client = storage.Client(project=project_id)
-        bucket = client.bucket(CAMPAIGN_IMAGES_BUCKET)
-        
-        # Create blob and upload
-        blob = bucket.blob(filename)
-        blob.upload_from_string(image_bytes, content_type='image/png')
-        
-        # Make blob publicly readable
-        blob.make_public()
-        
-        return blob.public_url
+        # The storage client is synchronous; keep the event loop free during the upload
+        return await asyncio.to_thread(_upload_image_blocking, image_bytes, filename)
         
     except Exception as e:
         logger.error(f"Failed to upload image to GCS: {e}")
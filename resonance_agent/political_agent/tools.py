@@ -229,6 +229,7 @@ async def create_candidate_analysis(
         
         # Store references in state
         tool_context.state["temp:candidate_analysis_artifact"] = filename
+        tool_context.state["candidate_analysis_artifact"] = filename
         tool_context.state["temp:analysis_metadata"] = {
             "candidate_name": candidate_name,
             "opponent_name": opponent_name,
@@ -1087,43 +1088,48 @@ async def filter_campaign_locations(
         df = pd.read_pickle(io.BytesIO(artifact.inline_data.data))
         logger.info(f"Loaded analysis data: {df.shape[0]} segments, {df.shape[1]} columns")
         
-        # Start with full dataframe
-        filtered_df = df.copy()
+        # Narrow one row mask per criterion and slice the frame once at the end,
+        # instead of copying the frame and re-filtering it at every step
+        mask = np.ones(len(df), dtype=bool)
+        selected = len(df)
         applied_filters = []
         
-        logger.info(f"🔍 Starting with {len(filtered_df)} locations")
+        logger.info(f"🔍 Starting with {selected} locations")
         logger.info(f"🔍 Filter criteria: {filter_criteria}")
         
         # Apply filters based on criteria
         for column, values in filter_criteria.items():
-            step_start_count = len(filtered_df)
+            step_start_count = selected
             
             if column in ["min_affinity", "min_popularity"]:
                 # Handle numeric thresholds
-                if column == "min_affinity" and "affinity" in filtered_df.columns:
-                    filtered_df = filtered_df[filtered_df['affinity'] >= values]
+                if column == "min_affinity" and "affinity" in df.columns:
+                    mask &= (df['affinity'] >= values).to_numpy()
+                    selected = int(mask.sum())
                     applied_filters.append(f"affinity >= {values}")
-                    logger.info(f"🔍 Applied {column} >= {values}: {step_start_count} → {len(filtered_df)} locations")
-                elif column == "min_popularity" and "popularity" in filtered_df.columns:
-                    filtered_df = filtered_df[filtered_df['popularity'] >= values]
+                    logger.info(f"🔍 Applied {column} >= {values}: {step_start_count} → {selected} locations")
+                elif column == "min_popularity" and "popularity" in df.columns:
+                    mask &= (df['popularity'] >= values).to_numpy()
+                    selected = int(mask.sum())
                     applied_filters.append(f"popularity >= {values}")
-                    logger.info(f"🔍 Applied {column} >= {values}: {step_start_count} → {len(filtered_df)} locations")
+                    logger.info(f"🔍 Applied {column} >= {values}: {step_start_count} → {selected} locations")
             else:
                 # Handle categorical filters
-                if column in filtered_df.columns:
+                if column in df.columns:
                     if isinstance(values, str):
                         values = [values]  # Convert single value to list
                     
-                    filtered_df = filtered_df[filtered_df[column].isin(values)]
+                    mask &= df[column].isin(values).to_numpy()
+                    selected = int(mask.sum())
                     applied_filters.append(f"{column}: {values}")
                     
-                    logger.info(f"🔍 Applied {column} filter: {step_start_count} → {len(filtered_df)} locations")
+                    logger.info(f"🔍 Applied {column} filter: {step_start_count} → {selected} locations")
                 else:
                     logger.warning(f"🔍 Column '{column}' not found in data")
         
-        logger.info(f"🔍 Final result: {len(filtered_df)} locations after all filters")
+        logger.info(f"🔍 Final result: {selected} locations after all filters")
         
-        if filtered_df.empty:
+        if not selected:
             return {
                 "status": "warning",
                 "message": "No locations found matching the filter criteria",
@@ -1131,10 +1137,8 @@ async def filter_campaign_locations(
                 "available_columns": list(df.columns)
             }
         
-        # Extract lat/long pairs
-        coordinates = []
-        for idx, row in filtered_df.iterrows():
-            coordinates.append([float(row['latitude']), float(row['longitude'])])
+        # Extract lat/long pairs straight from the coordinate columns
+        coordinates = df.loc[mask, ['latitude', 'longitude']].to_numpy(dtype=float).tolist()
         
         # Create simple location group data
         identified_locations = {
@@ -34,7 +34,8 @@ def get_complete_heatmap_analysis(
     gender: Optional[str] = None,
     boundary: Optional[str] = None,
     bias_trends: Optional[str] = None,
-    limit: int = 50
+    limit: int = 50,
+    min_popularity: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Core heatmap function - resolves names to IDs and returns raw JSON data
@@ -51,6 +52,7 @@ def get_complete_heatmap_analysis(
         boundary: Optional Heatmap boundary type ("geohashes", "city", "neighborhood")
         bias_trends: Optional bias trends parameter
         limit: Max data points to retrieve (1-50)
+        min_popularity: Optional Keep only points with popularity above this value
         
     Returns:
         DataFrame with raw heatmap data points and resolution info
@@ -261,6 +263,9 @@ def get_complete_heatmap_analysis(
             df = pd.DataFrame(result['data_points'])
             df['affinity']=pd.to_numeric(df['affinity'],errors='coerce')
             df['popularity']=pd.to_numeric(df['popularity'],errors='coerce')
+            if min_popularity is not None:
+                # Filter before the segment columns are built for rows that would be dropped anyway
+                df = df[df['popularity'] > min_popularity].reset_index(drop=True)
 
             # Add segment analysis (existing code)
             conditions = [